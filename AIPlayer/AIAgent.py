@@ -1,7 +1,7 @@
-import copy
 import random
 
 from AIPlayer.AIBrain import AIBrain
+from Gameplay import Definitions
 
 class AIAgent:
     """
@@ -10,7 +10,9 @@ class AIAgent:
     """
 
     def __init__(self, bumpiness=random.uniform(-1, 0), max_height=random.uniform(-1, 0), holes=random.uniform(-1, 0),
-                  cleared_rows=random.uniform(0, 1), search_method="col_scan"):
+                  cleared_rows=random.uniform(0, 1), search_method="col_scan",
+                 lookahead_preview=Definitions.LOOKAHEAD_PREVIEW, beam_width=Definitions.LOOKAHEAD_BEAM_WIDTH,
+                 time_budget=Definitions.LOOKAHEAD_TIME_BUDGET, deadline=Definitions.ANYTIME_DEADLINE):
         """
         Initializes the AI agent with given weights and the chosen search method.
 
@@ -18,17 +20,60 @@ class AIAgent:
         :param max_height: Weight for max height.
         :param holes: Weight for holes.
         :param cleared_rows: Weight for cleared rows.
-        :param search_method: "bfs" for BFS search, "col_scan" for column scan.
+        :param search_method: "bfs" for BFS search, "col_scan" for column scan, "batch" for column scan
+                              evaluated with array operations, "lookahead" for a beam search over the upcoming pieces,
+                              "anytime" for column scan refined by deeper searches until a deadline (for live play).
+        :param lookahead_preview: The number of upcoming pieces the lookahead search places.
+        :param beam_width: The number of boards the lookahead search keeps after every piece.
+        :param time_budget: Time in milliseconds a lookahead decision may take, None for no limit.
+        :param deadline: Time in milliseconds an anytime decision may take.
         """
-        if search_method not in ["bfs", "col_scan"]:
+        if search_method not in ["bfs", "col_scan", "batch", "lookahead", "anytime"]:
             raise ValueError("Invalid search method.")
 
         self.weights = [bumpiness, max_height, holes, cleared_rows]
         self.search_method = search_method
         self.best_moves = []
         self.last_shape_name = None
+        self.lookahead_preview = lookahead_preview
+        self.beam_width = beam_width
+        self.time_budget = time_budget
+        self.deadline = deadline
 
 
+    def _search(self, brain: AIBrain) -> tuple[float, list]:
+        """
+        Run the chosen search method.
+
+        :param brain: AIBrain instance holding the table and the weights.
+        :return: A tuple containing the best score and the moves to reach the best placement.
+        """
+        # Select the search function dynamically
+        if self.search_method == "bfs":
+            return brain.find_best_placement_bfs()
+        elif self.search_method == "col_scan":
+            return brain.find_best_placement_column_scan()
+        elif self.search_method == "batch":
+            return brain.find_best_placement_batch()
+        elif self.search_method == "lookahead":
+            return brain.find_best_placement_lookahead(self.lookahead_preview, self.beam_width, self.time_budget)
+        elif self.search_method == "anytime":
+            return brain.find_best_placement_anytime(self.deadline)
+
+    def choose_placement(self, table) -> tuple[tuple[int, int], int] | None:
+        """
+        Decide where the current shape should land, without the moves to get there.
+        Used by headless games, which commit the placement at once instead of replaying the moves.
+
+        :param table: Table instance representing the game board.
+        :return: A tuple ((row, col), orientation) of the best placement, or None if there is none.
+        """
+        brain = AIBrain(table, self.weights)
+        self._search(brain)
+        self.best_moves = []
+        self.last_shape_name = None
+        return brain.best_placement
+
     def choose_action(self, table):
         """
         Decide the best action for the current board state based on heuristic weights.
@@ -42,14 +87,8 @@ class AIAgent:
                 print(f"Error! unexpected move calculation.")
                 print(f"Current shape: {table.current_shape_name} last shape: {self.last_shape_name} moves left:", self.best_moves)
 
-            brain = AIBrain(copy.deepcopy(table), self.weights)
-
-            # Select the search function dynamically
-            if self.search_method == "bfs":
-                best_score, self.best_moves = brain.find_best_placement_bfs()
-            elif self.search_method == "col_scan":
-                best_score, self.best_moves = brain.find_best_placement_column_scan()
-
+            brain = AIBrain(table, self.weights)
+            best_score, self.best_moves = self._search(brain)
 
             self.last_shape_name = table.current_shape_name
 
@@ -64,3 +103,5 @@ class AIAgent:
             table.shift_right()
         elif best_action == 'drop':
             table.drop()
+        elif best_action == 'hard_drop':
+            table.hard_drop()
@@ -1,10 +1,13 @@
-from collections import deque
-from copy import deepcopy
 import numpy as np
 import json
+import time
 from datetime import datetime
 
-from Gameplay.Definitions import POINTS_PER_LINE
+from AIPlayer import BatchEvaluator
+from AIPlayer.Reachability import Reachability
+from Gameplay.Definitions import (POINTS_PER_LINE, LOOKAHEAD_PREVIEW, LOOKAHEAD_BEAM_WIDTH, LOOKAHEAD_TIME_BUDGET,
+                                  ANYTIME_DEADLINE, ANYTIME_LOOKAHEAD_HEIGHTS)
+from Gameplay.ShapeOrientations import ORIENTATIONS
 from Gameplay.Table import Table
 
 
@@ -18,13 +21,15 @@ class AIBrain:
         """
         Initialize the AI brain with a game board and heuristic weights.
 
-        :param table: The current Tetris board state.
+        :param table: The current Tetris board state. Searches run on it in place and restore it when done.
         :param weights: A list of heuristic weights used for evaluating board positions.
         :param is_logging: Whether the game should be logged.
         """
         self.table = table
         self.weights = weights
         self.is_logging = is_logging
+        self.best_placement = None  # ((row, col), orientation) of the best placement found by the last search
+        self.completed_plies = 0  # Upcoming pieces the last lookahead search placed in time
 
         if is_logging:
             self.log_data = {
@@ -64,7 +69,7 @@ class AIBrain:
         Simulate an action on the Tetris board and determine its effects.
 
         :param table: The current Tetris board state.
-        :param action: The action to perform ('rotate', 'left', 'right', or 'drop').
+        :param action: The action to perform ('rotate', 'left', 'right', 'drop' or 'hard_drop').
         :return: A tuple containing:
             - is_valid (bool): Whether the action was valid.
             - has_landed (bool): Whether the piece has landed.
@@ -80,6 +85,8 @@ class AIBrain:
             is_valid = table.shift_right()
         elif action == 'drop':
             is_valid = table.drop()
+        elif action == 'hard_drop':
+            is_valid = table.hard_drop()
 
         if self.is_logging:
             # Log the position after the action
@@ -92,10 +99,14 @@ class AIBrain:
 
         return is_valid, table.is_shape_landing(), table.shape_position, table.shape_orientation
 
-    def find_best_placement_bfs(self) -> tuple[float, list]:
+    def find_best_placement_bfs(self, time_budget=None) -> tuple[float, list]:
         """
         Find the best landing position for the current piece using a BFS (Breadth-First Search) algorithm.
+        The search runs over (row, col, orientation) states of the board, and the landing boards are evaluated
+        together with array operations.
 
+        :param time_budget: Time in milliseconds the search may take, None for no limit. When it runs out,
+                            no placement is found.
         :return: A tuple containing:
             - best_score (float): The highest evaluation score found.
             - best_moves (list): The sequence of moves to reach the best position.
@@ -111,69 +122,56 @@ class AIBrain:
                 'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             }
 
-        queue = deque()
-        visited = set()
+        deadline = time.perf_counter() + time_budget / 1000 if time_budget is not None else None
         best_score = float('-inf')
         best_moves = []
-
-        initial_state = deepcopy(self.table)
-        initial_pos = initial_state.shape_position
-        initial_orientation = initial_state.shape_orientation
-        initial_moves = []
-        for i in range(initial_state.rows - initial_state.get_max_height() - len(initial_state.current_shape) - 2):
-            new_state: Table = deepcopy(initial_state)
-            is_valid, has_landed, initial_pos, initial_state = self._simulate_action(new_state, 'drop')
-            initial_state: Table = deepcopy(new_state)
-
-        queue.append((initial_state, initial_moves, initial_pos, initial_orientation))
-
-        while queue:
-            current_state, moves, position, orientation = queue.popleft()
-            state_key = (position[0], position[1], orientation)
-
-            if state_key in visited:
-                continue
-
-            visited.add(state_key)
-
-            if self.is_logging:
-                self.log_data['visited_spots'].add(str(state_key))
-
-            for action in ['drop', 'left', 'right', 'rotate']:
-
-                if current_state.current_shape_name == 'O' and action == 'rotate': # Skip O rotations
-                    continue
-
-                new_state: Table = deepcopy(current_state)
-                is_valid, has_landed, new_pos, new_orientation = self._simulate_action(new_state, action)
-
-                if not is_valid: # Skip invalid positions
-                    continue
-
-                new_moves = moves + [action]
-
-                if has_landed:
-                    score = self._evaluate_board(new_state)
-
-                    if score > best_score:
-                        best_score = score
-                        best_moves = new_moves
-
-                    if self.is_logging:
-                        self.log_data['moves'].append({
-                            'sequence': new_moves,
-                            'final_position': (new_pos[0], new_pos[1]),
-                            'orientation': new_orientation,
-                            'score': score
-                        })
-                else:
-                    if new_state.current_shape is None:
-                        print(new_state)
-                        breakpoint()
-
-                    queue.append((new_state, new_moves, new_pos, new_orientation))
+        self.best_placement = None
+
+        table = self.table
+        orientation = table.current_orientation
+        row, col = table.shape_position
+
+        # Start the search a few rows above the stack, without dropping through the empty rows one by one
+        drops = max(table.rows - table.get_max_height() - len(table.current_shape) - 2, 0)
+        row = min(row + drops, table.landing_row(orientation, col, row))
+
+        # Find every reachable landing state on the board, then evaluate all of them at once
+        board = table.board
+        reachability = Reachability(board, table.current_shape_name)
+        landings = reachability.search(row, col, orientation.index, deadline)
+        if landings is None:
+            return best_score, best_moves
+        positions = [reachability.position(landing) for landing in landings]
+        scores = np.zeros(0)
+        if positions:
+            orientations = ORIENTATIONS[table.current_shape_name]
+            rows = np.array([position[0] for position, _ in positions])
+            cols = np.array([position[1] for position, _ in positions])
+            cells = np.array([orientations[index].cells for _, index in positions])
+            features = BatchEvaluator.placement_features(board, cells, rows, cols)
+
+            # Summed in the same order as _evaluate_board, so ties are broken like on the table
+            scores = BatchEvaluator.weighted_scores(features, self.weights)
+
+            # The first landing found wins ties, like a strict comparison in discovery order
+            best = int(np.argmax(scores))
+            best_score = float(scores[best])
+            best_moves = reachability.moves_to(landings[best])
+            (best_row, best_col), best_index = positions[best]
+            self.best_placement = ((best_row, best_col), best_index * 90)
 
         if self.is_logging:
+            for state in reachability.parents:
+                (state_row, state_col), index = reachability.position(state)
+                self.log_data['visited_spots'].add(str((state_row, state_col, index * 90)))
+            for landing, ((landing_row, landing_col), index), score in zip(landings, positions, scores):
+                self.log_data['moves'].append({
+                    'sequence': reachability.moves_to(landing),
+                    'final_position': (landing_row, landing_col),
+                    'orientation': index * 90,
+                    'score': float(score)
+                })
+
             # Save the best result
             self.log_data['best_score'] = best_score
             self.log_data['best_moves'] = best_moves
@@ -204,45 +202,49 @@ class AIBrain:
 
         best_score = float('-inf')
         best_moves = []
-        initial_state = deepcopy(self.table)
+        self.best_placement = None
 
+        # Every candidate is tried on the same table, restored from a snapshot instead of copied
+        table = self.table
+        initial_token = table.snapshot()
+        initial_col = table.shape_position[1]
 
         # Try all 4 possible rotations (except for 'O' piece that doesn't rotate)
-        for rotation in range(4 if initial_state.current_shape_name != 'O' else 1):
-            rotated_state = deepcopy(initial_state)
+        for rotation in range(4 if table.current_shape_name != 'O' else 1):
+            table.restore(initial_token)
             for _ in range(rotation):
-                self._simulate_action(rotated_state, 'rotate')
+                self._simulate_action(table, 'rotate')
+            rotated_token = table.snapshot()
+            rotated_orientation = table.shape_orientation
 
             # Try all possible column positions
 
-            effective_width = int(np.sum(np.any(rotated_state.current_shape, axis=0)))
-            offset = int(np.argmax(np.concatenate((~np.all(rotated_state.current_shape == 0, axis=0), [True]))))
-            for col in range(- offset, initial_state.cols - offset - effective_width + 1):
-                test_state = deepcopy(rotated_state)
-                is_valid = test_state.shape_reposition((0, col), test_state.shape_orientation)
+            effective_width = table.current_orientation.width
+            offset = table.current_orientation.left
+            for col in range(- offset, table.cols - offset - effective_width + 1):
+                table.restore(rotated_token)
+                is_valid = table.shape_reposition((0, col), rotated_orientation)
 
                 if not is_valid:
                     continue
 
                 # Drop the piece to the lowest valid position
-                has_landed = False
-                while not has_landed:
-                    has_landed = self._simulate_action(test_state,'drop')[1]
+                self._simulate_action(table, 'hard_drop')
 
-                score = self._evaluate_board(test_state)
+                score = self._evaluate_board(table)
 
                 if self.is_logging:
-                    curr_row = test_state.shape_position[0]
-                    curr_col = test_state.shape_position[1]
-                    curr_or = test_state.shape_orientation
+                    curr_row = table.shape_position[0]
+                    curr_col = table.shape_position[1]
+                    curr_or = table.shape_orientation
 
                     self.log_data['visited_spots'].add(str((curr_row, curr_col, curr_or)))
                     self.log_data['moves'].append({
                         'sequence': ['rotate'] * rotation +
-                                    ['right' if col > initial_state.shape_position[1] else 'left'] * abs(col - initial_state.shape_position[1]) +
+                                    ['right' if col > initial_col else 'left'] * abs(col - initial_col) +
                                     ['drop'] * (curr_row + 1),
                         'final_position': (curr_row, curr_col),
-                        'orientation': test_state.shape_orientation,
+                        'orientation': curr_or,
                         'score': score
                     })
 
@@ -250,8 +252,11 @@ class AIBrain:
                 if score > best_score:
                     best_score = score
                     best_moves = ['rotate'] * rotation + [
-                        'right' if col > initial_state.shape_position[1] else 'left'] * abs(
-                        col - initial_state.shape_position[1]) + ['drop'] * (test_state.shape_position[0] + 1)
+                        'right' if col > initial_col else 'left'] * abs(
+                        col - initial_col) + ['drop'] * (table.shape_position[0] + 1)
+                    self.best_placement = (table.shape_position, table.shape_orientation)
+
+        table.restore(initial_token)
 
         if self.is_logging:
             # Save the best result
@@ -263,6 +268,211 @@ class AIBrain:
 
         return best_score, best_moves
 
+    def find_best_placement_batch(self) -> tuple[float, list]:
+        """
+        Find the best placement among the column scan candidates, evaluating all of them at once
+        with array operations instead of simulating every candidate on the table.
+
+        :return: A tuple containing:
+            - best_score (float): The highest evaluation score found.
+            - best_moves (list): The sequence of moves to reach the best position.
+        """
+        if self.is_logging:
+            # Reset log data for new search
+            self.log_data = {
+                'explored_positions': [],
+                'scores': [],
+                'moves': [],
+                'visited_spots': set(),
+                'piece_type': self.table.current_shape_name,
+                'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            }
+
+        initial_col = self.table.shape_position[1]
+        rotations, orientations, rows, cols, scores = BatchEvaluator.evaluate_column_scan(self.table, self.weights)
+
+        best_score = float('-inf')
+        best_moves = []
+        self.best_placement = None
+        if len(scores) > 0:
+            best = int(np.argmax(scores))
+            best_score = float(scores[best])
+            best_moves = ['rotate'] * int(rotations[best]) + [
+                'right' if cols[best] > initial_col else 'left'] * abs(
+                int(cols[best]) - initial_col) + ['drop'] * (int(rows[best]) + 1)
+            self.best_placement = ((int(rows[best]), int(cols[best])), int(orientations[best]) * 90)
+
+        if self.is_logging:
+            for rotation, orientation, row, col, score in zip(rotations, orientations, rows, cols, scores):
+                self.log_data['visited_spots'].add(str((int(row), int(col), int(orientation) * 90)))
+                self.log_data['moves'].append({
+                    'sequence': ['rotate'] * int(rotation) +
+                                ['right' if col > initial_col else 'left'] * abs(int(col) - initial_col) +
+                                ['drop'] * (int(row) + 1),
+                    'final_position': (int(row), int(col)),
+                    'orientation': int(orientation) * 90,
+                    'score': float(score)
+                })
+
+            # Save the best result
+            self.log_data['best_score'] = best_score
+            self.log_data['best_moves'] = best_moves
+
+            # Save to file
+            self._save_log()
+
+        return best_score, best_moves
+
+    def find_best_placement_lookahead(self, preview=LOOKAHEAD_PREVIEW, beam_width=LOOKAHEAD_BEAM_WIDTH,
+                                      time_budget=LOOKAHEAD_TIME_BUDGET) -> tuple[float, list]:
+        """
+        Find the best placement of the current piece by also placing the upcoming pieces of the shape generator.
+        Every ply places the next piece at every column scan candidate of the boards kept from the previous ply,
+        then keeps the beam_width best boards. Boards reached in several ways are kept once (a transposition table),
+        with the most cleared rows reward collected on the way.
+        A leaf is scored by the heuristic of its board plus the cleared rows reward of every ply.
+
+        :param preview: The number of upcoming pieces to place after the current one.
+        :param beam_width: The number of boards kept after every ply.
+        :param time_budget: Time in milliseconds the decision may take, None for no limit. When it runs out,
+                            the best placement of the last complete ply is used.
+        :return: A tuple containing:
+            - best_score (float): The score of the best leaf.
+            - best_moves (list): The sequence of moves to reach the best position of the current piece.
+        """
+        if self.is_logging:
+            # Reset log data for new search
+            self.log_data = {
+                'explored_positions': [],
+                'scores': [],
+                'moves': [],
+                'visited_spots': set(),
+                'piece_type': self.table.current_shape_name,
+                'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            }
+
+        deadline = time.perf_counter() + time_budget / 1000 if time_budget is not None else float('inf')
+        weights = np.asarray(self.weights, dtype=float)
+        table = self.table
+        initial_col = table.shape_position[1]
+
+        # First ply, the current piece at every column scan candidate
+        board = table.board != 0
+        rotations, orientations, cols, cells = BatchEvaluator.column_scan_candidates(table)
+        rows = BatchEvaluator.stacked_landing_rows(board[None], cells[None], cols[None])[0]
+        valid = rows >= 0
+        rotations, orientations, cols, cells, rows = (rotations[valid], orientations[valid], cols[valid],
+                                                      cells[valid], rows[valid])
+
+        best_score = float('-inf')
+        best_moves = []
+        self.best_placement = None
+        self.completed_plies = 0
+        if len(rows) == 0:
+            return best_score, best_moves
+
+        boards, cleared = BatchEvaluator.placement_boards(np.repeat(board[None], len(rows), axis=0), cells, rows, cols)
+        features = np.column_stack([BatchEvaluator.board_features(boards), BatchEvaluator.CLEARED_REWARD[cleared]])
+        scores = BatchEvaluator.weighted_scores(features, weights)
+        collected = weights[3] * BatchEvaluator.CLEARED_REWARD[cleared]
+        roots = np.arange(len(rows))
+        best = int(np.argmax(scores))
+        best_root, best_score = best, float(scores[best])
+
+        for shape_name in table.shape_generator.peek(preview):
+            # Keep the best boards, every distinct board once
+            transpositions = {}
+            for node in np.argsort(-scores, kind='stable'):
+                key = boards[node].tobytes()
+                if key not in transpositions:
+                    transpositions[key] = node
+                    if len(transpositions) == beam_width:
+                        break
+            beam = np.array(list(transpositions.values()))
+
+            # Place the next piece at every candidate of every kept board
+            parents, child_cols, child_cells = [], [], []
+            for node in beam:
+                if time.perf_counter() >= deadline:
+                    break
+                _, _, node_cols, node_cells = BatchEvaluator.spawn_candidates(boards[node], shape_name)
+                parents.append(np.full(len(node_cols), node))
+                child_cols.append(node_cols)
+                child_cells.append(node_cells)
+
+            # Out of time, the last complete ply decides
+            if len(parents) < len(beam):
+                break
+
+            parents, child_cols, child_cells = np.concatenate(parents), np.concatenate(child_cols), np.concatenate(child_cells)
+            child_rows = BatchEvaluator.stacked_landing_rows(boards[parents], child_cells[:, None], child_cols[:, None])[:, 0]
+            valid = child_rows >= 0
+            if not valid.any():
+                break
+
+            parents = parents[valid]
+            boards, cleared = BatchEvaluator.placement_boards(boards[parents], child_cells[valid],
+                                                              child_rows[valid], child_cols[valid])
+            features = np.column_stack([BatchEvaluator.board_features(boards), BatchEvaluator.CLEARED_REWARD[cleared]])
+            scores = BatchEvaluator.weighted_scores(features, weights) + collected[parents]
+            collected = collected[parents] + weights[3] * BatchEvaluator.CLEARED_REWARD[cleared]
+            roots = roots[parents]
+
+            best = int(np.argmax(scores))
+            best_root, best_score = int(roots[best]), float(scores[best])
+            self.completed_plies += 1
+
+        best_moves = ['rotate'] * int(rotations[best_root]) + [
+            'right' if cols[best_root] > initial_col else 'left'] * abs(
+            int(cols[best_root]) - initial_col) + ['drop'] * (int(rows[best_root]) + 1)
+        self.best_placement = ((int(rows[best_root]), int(cols[best_root])), int(orientations[best_root]) * 90)
+
+        if self.is_logging:
+            self.log_data['visited_spots'].add(str((int(rows[best_root]), int(cols[best_root]),
+                                                    int(orientations[best_root]) * 90)))
+
+            # Save the best result
+            self.log_data['best_score'] = best_score
+            self.log_data['best_moves'] = best_moves
+
+            # Save to file
+            self._save_log()
+
+        return best_score, best_moves
+
+    def find_best_placement_anytime(self, deadline=ANYTIME_DEADLINE) -> tuple[float, list]:
+        """
+        Find a placement within a deadline, for live play. The column scan answer comes first, and is refined
+        while time remains: with BFS on a low board, and with the lookahead search on a high board,
+        looking further ahead the higher the board (see Definitions.ANYTIME_LOOKAHEAD_HEIGHTS).
+        A refinement that does not finish in time leaves the column scan answer.
+
+        :param deadline: Time in milliseconds the decision may take.
+        :return: A tuple containing:
+            - best_score (float): The score of the best placement found in time.
+            - best_moves (list): The sequence of moves to reach the best position.
+        """
+        start_time = time.perf_counter()
+        best_score, best_moves = self.find_best_placement_column_scan()
+        best_placement = self.best_placement
+
+        remaining = deadline - (time.perf_counter() - start_time) * 1000
+        if best_placement is not None and remaining > 0:
+            preview = sum(self.table.get_max_height() >= height for height in ANYTIME_LOOKAHEAD_HEIGHTS)
+            if preview == 0:
+                # BFS also finds slides and tucks, and scores them like column scan
+                score, moves = self.find_best_placement_bfs(time_budget=remaining)
+                if self.best_placement is not None and score > best_score:
+                    best_score, best_moves, best_placement = score, moves, self.best_placement
+            else:
+                # The lookahead stops at the last ply it completes in time, without one it only repeats column scan
+                score, moves = self.find_best_placement_lookahead(preview, time_budget=remaining)
+                if self.completed_plies > 0:
+                    best_score, best_moves, best_placement = score, moves, self.best_placement
+
+        self.best_placement = best_placement
+        return best_score, best_moves
+
     def _save_log(self):
         """
         Save the AI's decision log to a JSON file.
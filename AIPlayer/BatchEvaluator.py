@@ -0,0 +1,297 @@
+import numpy as np
+
+from Gameplay.Definitions import POINTS_PER_LINE
+from Gameplay.ShapeOrientations import ORIENTATIONS
+
+# Normalized reward of clearing 0-4 rows, like AIBrain._evaluate_board
+CLEARED_REWARD = np.array(POINTS_PER_LINE, dtype=float) / POINTS_PER_LINE[1]
+
+# Rows at the top of the board a spawned shape covers
+SPAWN_ROWS = 4
+
+# Scores of a matrix product this close to the best one are re-scored exactly, to break ties like column scan
+TIE_TOLERANCE = 1e-9
+
+# Candidates of spawn_candidates on boards with empty spawn rows, by (shape name, board columns)
+_open_spawn_candidates = {}
+
+
+def board_features(boards: np.ndarray) -> np.ndarray:
+    """
+    Calculate the heuristic statistics of a stack of boards with array operations.
+
+    :param boards: An array of shape (..., rows, cols), non-zero cells are occupied.
+    :return: An array of shape (..., 3) holding the bumpiness, max height and holes of every board.
+    """
+    filled = boards != 0
+    rows = filled.shape[-2]
+    heights = np.where(filled.any(axis=-2), rows - filled.argmax(axis=-2), 0)
+    bumpiness = np.abs(np.diff(heights, axis=-1)).sum(axis=-1)
+    max_height = heights.max(axis=-1)
+    holes = heights.sum(axis=-1) - filled.sum(axis=(-2, -1))
+    return np.stack([bumpiness, max_height, holes], axis=-1)
+
+
+def weighted_scores(features: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """
+    Score heuristic statistics by the weights, summed in the same order as AIBrain._evaluate_board.
+    A matrix product rounds differently, which breaks exact ties differently than column scan.
+
+    :param features: The bumpiness, max height, holes and cleared rows reward, an array of shape (..., 4).
+    :param weights: The heuristic weights, an array of shape (..., 4) broadcast against the features.
+    :return: The score of every row of features.
+    """
+    weights = np.asarray(weights, dtype=float)
+    return (weights[..., 0] * features[..., 0] + weights[..., 1] * features[..., 1] +
+            weights[..., 2] * features[..., 2] + weights[..., 3] * features[..., 3])
+
+
+def clear_full_rows(boards: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Clear the full rows of a stack of boards, moving the rows above them down.
+
+    :param boards: An array of shape (n, rows, cols), modified in place.
+    :return: A tuple containing:
+        - boards (np.ndarray): The boards after clearing.
+        - cleared (np.ndarray): The number of rows cleared on every board.
+    """
+    full = (boards != 0).all(axis=2)
+    cleared = full.sum(axis=1)
+    if not cleared.any():
+        return boards, cleared
+
+    # A stable sort moves the full rows to the top and keeps the order of the other rows
+    clearing = np.flatnonzero(cleared)
+    order = np.argsort(~full[clearing], axis=1, kind='stable')
+    moved = np.take_along_axis(boards[clearing], order[:, :, None], axis=1)
+    moved[np.arange(boards.shape[1])[None, :] < cleared[clearing, None]] = 0
+    boards[clearing] = moved
+    return boards, cleared
+
+
+def stacked_landing_rows(boards: np.ndarray, cells: np.ndarray, cols: np.ndarray) -> np.ndarray:
+    """
+    Find where candidates come to rest on a stack of boards when dropped straight down from row 0.
+    Candidates that start above the surface land on the column heights, like Table.landing_row,
+    the others (under an overhang near the top) are dropped row by row.
+
+    :param boards: The boards, an array of shape (n, rows, cols).
+    :param cells: The (row, col) offsets of the occupied cells of the candidates of every board, shape (n, k, 4, 2).
+    :param cols: The column of the top-left corner of the candidates of every board, shape (n, k).
+    :return: The landing row of every candidate, shape (n, k), or -1 where the candidate does not fit at row 0.
+    """
+    filled = boards != 0
+    rows = filled.shape[1]
+    tops = np.where(filled.any(axis=1), filled.argmax(axis=1), rows)
+    cell_cols = cols[:, :, None] + cells[:, :, :, 1]
+    landing = (tops[np.arange(len(boards))[:, None, None], cell_cols] - 1 - cells[:, :, :, 0]).min(axis=2)
+
+    under_surface = np.nonzero(landing < 0)
+    if len(under_surface[0]):
+        board_index = under_surface[0]
+        landing[under_surface] = landing_rows_on_boards(boards[board_index], cells[under_surface],
+                                                        cols[under_surface], np.zeros_like(board_index))
+    return landing
+
+
+def landing_rows_on_boards(boards: np.ndarray, cells: np.ndarray, cols: np.ndarray, start_rows: np.ndarray) -> np.ndarray:
+    """
+    Drop candidates row by row, every candidate on its own board.
+
+    :param boards: The board of every candidate, shape (n, rows, cols).
+    :param cells: The (row, col) offsets of the occupied cells of every candidate, shape (n, 4, 2).
+    :param cols: The column of the top-left corner of every candidate, shape (n,).
+    :param start_rows: The row of the top-left corner every candidate is dropped from, shape (n,).
+    :return: The landing row of every candidate, or -1 where the candidate does not fit at its start row.
+    """
+    n, rows, _ = boards.shape
+    offsets = np.arange(rows + 1)
+    cell_rows = start_rows[:, None, None] + offsets[None, :, None] + cells[:, None, :, 0]
+    cell_cols = cols[:, None, None] + cells[:, None, :, 1]
+
+    # Pad the bottom with occupied rows, so leaving the board counts as a collision
+    padding = np.ones((n, max(int(cell_rows.max()) - rows + 1, 0), boards.shape[2]), dtype=bool)
+    padded = np.concatenate([boards != 0, padding], axis=1)
+    blocked = (padded[np.arange(n)[:, None, None], np.clip(cell_rows, 0, None), cell_cols].any(axis=2) |
+               (cell_rows < 0).any(axis=2))
+
+    # The shape rests one row above its first collision
+    landing = start_rows + blocked.argmax(axis=1) - 1
+    landing[blocked[:, 0]] = -1
+    return landing
+
+
+def column_scan_candidates(table) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    List the candidates column scan tries for the current shape of a table, in the same order:
+    every rotation from the spawn position, then every column from left to right.
+
+    :param table: The Table holding the current shape.
+    :return: A tuple containing:
+        - rotations (np.ndarray): The number of rotate actions of every candidate.
+        - orientations (np.ndarray): The orientation index reached by those rotations.
+        - cols (np.ndarray): The column of the top-left corner of every candidate.
+        - cells (np.ndarray): The (row, col) offsets of the occupied cells, shape (n, 4, 2).
+    """
+    orientations_of_shape = ORIENTATIONS[table.current_shape_name]
+    rotations, orientations, cols, cells = [], [], [], []
+
+    orientation = table.current_orientation
+    for rotation in range(4 if table.current_shape_name != 'O' else 1):
+        if rotation > 0:
+            # Rotating at the spawn position may be blocked, in which case the orientation is kept
+            rotated = orientations_of_shape[(orientation.index + 1) % 4]
+            if table.can_place(rotated, table.shape_position):
+                orientation = rotated
+
+        for col in range(-orientation.left, table.cols - orientation.left - orientation.width + 1):
+            rotations.append(rotation)
+            orientations.append(orientation.index)
+            cols.append(col)
+            cells.append(orientation.cells)
+
+    return np.array(rotations), np.array(orientations), np.array(cols), np.array(cells)
+
+
+def column_scan_features(table) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Build the landing board of every column scan candidate of the current shape of a table as one
+    stacked array, and calculate the heuristic statistics of all of them with array operations.
+
+    :param table: The Table holding the current shape.
+    :return: A tuple containing:
+        - rotations (np.ndarray): The number of rotate actions of every valid candidate.
+        - orientations (np.ndarray): The orientation index of every valid candidate.
+        - rows (np.ndarray): The landing row of every valid candidate.
+        - cols (np.ndarray): The landing column of every valid candidate.
+        - features (np.ndarray): The bumpiness, max height, holes and cleared rows reward of every
+                                 valid candidate, shape (candidates, 4).
+    """
+    board = table.board
+    rotations, orientations, cols, cells = column_scan_candidates(table)
+    rows = stacked_landing_rows(board[None], cells[None], cols[None])[0]
+
+    valid = rows >= 0
+    rotations, orientations, cols, cells, rows = (rotations[valid], orientations[valid], cols[valid],
+                                                  cells[valid], rows[valid])
+
+    return rotations, orientations, rows, cols, placement_features(board, cells, rows, cols)
+
+
+def placement_features(board: np.ndarray, cells: np.ndarray, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+    """
+    Stamp every placement on its own copy of a board, clear the full rows, and calculate the heuristic statistics
+    of all of them with array operations.
+
+    :param board: The board, an array of shape (rows, cols).
+    :param cells: The (row, col) offsets of the occupied cells of every placement, shape (n, 4, 2).
+    :param rows: The row of the top-left corner of every placement, shape (n,).
+    :param cols: The column of the top-left corner of every placement, shape (n,).
+    :return: The bumpiness, max height, holes and cleared rows reward of every placement, shape (n, 4).
+    """
+    boards, cleared = placement_boards(np.repeat((board != 0)[None], len(rows), axis=0), cells, rows, cols)
+    return np.column_stack([board_features(boards), CLEARED_REWARD[cleared]])
+
+
+def placement_boards(boards: np.ndarray, cells: np.ndarray, rows: np.ndarray, cols: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Stamp every placement on its own board and clear the full rows.
+
+    :param boards: The board of every placement, a boolean array of shape (n, rows, cols), modified in place.
+    :param cells: The (row, col) offsets of the occupied cells of every placement, shape (n, 4, 2).
+    :param rows: The row of the top-left corner of every placement, shape (n,).
+    :param cols: The column of the top-left corner of every placement, shape (n,).
+    :return: A tuple containing:
+        - boards (np.ndarray): The boards after every placement.
+        - cleared (np.ndarray): The number of rows every placement cleared.
+    """
+    placements = np.arange(len(rows))[:, None]
+    boards[placements, rows[:, None] + cells[:, :, 0], cols[:, None] + cells[:, :, 1]] = True
+    return clear_full_rows(boards)
+
+
+def spawn_candidates(board: np.ndarray, shape_name: str) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    List the column scan candidates of a shape about to spawn on a board, like column_scan_candidates does
+    for the current shape of a table, without a Table.
+
+    :param board: The board, an array of shape (rows, cols).
+    :param shape_name: The name of the shape.
+    :return: A tuple containing:
+        - rotations (np.ndarray): The number of rotate actions of every candidate.
+        - orientations (np.ndarray): The orientation index reached by those rotations.
+        - cols (np.ndarray): The column of the top-left corner of every candidate.
+        - cells (np.ndarray): The (row, col) offsets of the occupied cells, shape (n, 4, 2).
+    """
+    filled = board != 0
+    board_cols = filled.shape[1]
+
+    # Nothing blocks the rotations when the spawn rows are empty, so the candidates are the same on every such board
+    spawn_rows_empty = not filled[:SPAWN_ROWS].any()
+    if spawn_rows_empty and (shape_name, board_cols) in _open_spawn_candidates:
+        return _open_spawn_candidates[(shape_name, board_cols)]
+
+    orientations_of_shape = ORIENTATIONS[shape_name]
+    spawn_col = board_cols // 2 - len(orientations_of_shape[0].matrix) // 2
+    rotations, orientations, cols, cells = [], [], [], []
+
+    orientation = orientations_of_shape[0]
+    for rotation in range(4 if shape_name != 'O' else 1):
+        if rotation > 0:
+            # Rotating at the spawn position may be blocked, in which case the orientation is kept
+            rotated = orientations_of_shape[(orientation.index + 1) % 4]
+            if (spawn_col + rotated.left >= 0 and spawn_col + rotated.right < board_cols and
+                    not any(filled[r, spawn_col + c] for r, c in rotated.cells)):
+                orientation = rotated
+
+        for col in range(-orientation.left, board_cols - orientation.left - orientation.width + 1):
+            rotations.append(rotation)
+            orientations.append(orientation.index)
+            cols.append(col)
+            cells.append(orientation.cells)
+
+    candidates = np.array(rotations), np.array(orientations), np.array(cols), np.array(cells)
+    if spawn_rows_empty:
+        _open_spawn_candidates[(shape_name, board_cols)] = candidates
+    return candidates
+
+
+def evaluate_column_scan(table, weights) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Evaluate every column scan candidate of the current shape of a table at once.
+
+    :param table: The Table holding the current shape.
+    :param weights: The heuristic weights (bumpiness, max height, holes, cleared rows).
+    :return: A tuple containing:
+        - rotations (np.ndarray): The number of rotate actions of every valid candidate.
+        - orientations (np.ndarray): The orientation index of every valid candidate.
+        - rows (np.ndarray): The landing row of every valid candidate.
+        - cols (np.ndarray): The landing column of every valid candidate.
+        - scores (np.ndarray): The heuristic score of every valid candidate.
+    """
+    rotations, orientations, rows, cols, features = column_scan_features(table)
+    return rotations, orientations, rows, cols, weighted_scores(features, weights)
+
+
+def best_candidates(features: np.ndarray, weights: np.ndarray, states: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    """
+    Choose the best candidate of many games, where games in the same state (board and shape) share their candidates.
+    The candidates are scored with one batched matrix product of the features by the weights of every game. A matrix
+    product rounds differently than column scan, so the candidates within TIE_TOLERANCE of the best score are
+    re-scored with weighted_scores, and the first of them with the highest exact score wins, like column scan.
+
+    :param features: The features of the candidates of every distinct state, shape (states, candidates, features).
+    :param weights: The heuristic weights of every game, shape (games, features).
+    :param states: The index of the state of every game, shape (games,).
+    :param valid: Which candidates of every game fit on the board, shape (games, candidates).
+    :return: The index of the best candidate of every game, shape (games,). Meaningless for games without any
+             valid candidate.
+    """
+    scores = np.matmul(features[states], weights[:, :, None])[..., 0]
+    scores[~valid] = -np.inf
+
+    # Break near ties with the exact scores of the close candidates only
+    games, candidates = np.nonzero(valid & (scores >= scores.max(axis=1, keepdims=True) - TIE_TOLERANCE))
+    exact = np.full(scores.shape, -np.inf)
+    exact[games, candidates] = weighted_scores(features[states[games], candidates], weights[games])
+    return exact.argmax(axis=1)
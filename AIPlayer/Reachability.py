@@ -0,0 +1,138 @@
+import time
+
+import numpy as np
+
+from Gameplay.ShapeOrientations import ORIENTATIONS
+
+# Columns left of the board a state may take (a shape matrix can stick out by up to 3 empty columns),
+# plus one more so every move from a valid state stays inside the state array
+COL_PADDING = 4
+
+# The actions tried from every state, in the order of AIBrain.find_best_placement_bfs
+ACTIONS = ('drop', 'left', 'right', 'rotate')
+
+# States visited between two checks of the search deadline
+DEADLINE_CHECK_INTERVAL = 64
+
+
+class Reachability:
+    """
+    The Reachability class finds every placement the current shape can reach with drop, left, right and rotate
+    actions, without moving a shape on a Table.
+    """
+
+    def __init__(self, board: np.ndarray, shape_name: str):
+        """
+        Precompute where every orientation of a shape fits on a board.
+
+        :param board: The board, an array of shape (rows, cols), non-zero cells are occupied.
+        :param shape_name: The name of the shape to search placements for.
+        """
+        self.shape_name = shape_name
+        self.rows, self.cols = board.shape
+        self.width = self.cols + COL_PADDING + 1
+        self.layer = (self.rows + 1) * self.width
+
+        # Occupied cells around the board, so shapes leaving it collide
+        padded = np.ones((self.rows + 4, self.width + 3), dtype=bool)
+        padded[:self.rows, COL_PADDING:COL_PADDING + self.cols] = board != 0
+
+        # fits[orientation, row, col + COL_PADDING] is True where the orientation does not collide
+        fits = np.ones((4, self.rows + 1, self.width), dtype=bool)
+        for orientation in ORIENTATIONS[shape_name]:
+            for r, c in orientation.cells:
+                fits[orientation.index] &= ~padded[r:r + self.rows + 1, c:c + self.width]
+        self.fits = fits.reshape(-1).tolist()
+
+        self.parents = None
+        self.landings = []
+
+    def state(self, row, col, orientation_index) -> int:
+        """
+        Get the flat index of a state.
+
+        :param row: The row of the top-left corner.
+        :param col: The column of the top-left corner.
+        :param orientation_index: The orientation index (0-3).
+        :return: The index of the state.
+        """
+        return orientation_index * self.layer + row * self.width + col + COL_PADDING
+
+    def position(self, state) -> tuple[tuple[int, int], int]:
+        """
+        Get the position and orientation of a state.
+
+        :param state: The index of the state.
+        :return: A tuple ((row, col), orientation_index).
+        """
+        orientation_index, rest = divmod(state, self.layer)
+        row, col = divmod(rest, self.width)
+        return (row, col - COL_PADDING), orientation_index
+
+    def search(self, row, col, orientation_index, deadline=None) -> list[int] | None:
+        """
+        Run a BFS from a starting state, visiting states in the same order as AIBrain.find_best_placement_bfs.
+
+        :param row: The starting row of the top-left corner.
+        :param col: The starting column of the top-left corner.
+        :param orientation_index: The starting orientation index.
+        :param deadline: The time.perf_counter() time the search gives up at (optional).
+        :return: The states where the shape lands (a drop is blocked), in the order they are found,
+                 or None if the deadline passed first.
+        """
+        fits = self.fits
+        width, layer = self.width, self.layer
+        rotates = self.shape_name != 'O'
+
+        start = self.state(row, col, orientation_index)
+        parents = {start: None}
+        landings = []
+        queue = [start]
+
+        # The queue is a list read with a moving head, every state is pushed once
+        head = 0
+        while head < len(queue):
+            if deadline is not None and head % DEADLINE_CHECK_INTERVAL == 0 and time.perf_counter() >= deadline:
+                return None
+            current = queue[head]
+            head += 1
+
+            below = current + width
+            if fits[below]:
+                if below not in parents:
+                    parents[below] = (current, 'drop')
+                    queue.append(below)
+            else:
+                landings.append(current)
+
+            for neighbour, action in ((current - 1, 'left'), (current + 1, 'right')):
+                if fits[neighbour] and neighbour not in parents:
+                    parents[neighbour] = (current, action)
+                    queue.append(neighbour)
+
+            if rotates:
+                # Rotating from the last orientation wraps around to the first one
+                rotated = current + layer if current < 3 * layer else current - 3 * layer
+                if fits[rotated] and rotated not in parents:
+                    parents[rotated] = (current, 'rotate')
+                    queue.append(rotated)
+
+        self.parents = parents
+        self.landings = landings
+        return landings
+
+    def moves_to(self, landing) -> list[str]:
+        """
+        Rebuild the moves from the starting state to a landing state, including the drop that lands the shape.
+
+        :param landing: The index of a landing state found by the last search.
+        :return: The list of actions.
+        """
+        moves = ['drop']
+        step = self.parents[landing]
+        while step is not None:
+            landing, action = step
+            moves.append(action)
+            step = self.parents[landing]
+        moves.reverse()
+        return moves
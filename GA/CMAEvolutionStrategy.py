@@ -0,0 +1,158 @@
+import logging
+import math
+
+import numpy as np
+
+from eckity.fitness.simple_fitness import SimpleFitness
+from eckity.population import Population
+from eckity.subpopulation import Subpopulation
+
+from GA.Evaluator import Evaluator
+from GA.GenerationTerminationChecker import GenerationTerminationChecker
+from GA.Genetics import WeightCreator, WeightIndividual
+from GA.PopulationEvaluator import PopulationEvaluator
+from Gameplay import Definitions
+
+# Center of the weights WeightIndividual draws: three penalties in [-1, 0] and the cleared lines reward in [0, 1]
+INITIAL_MEAN = (-0.5, -0.5, -0.5, 0.5)
+
+
+class CMAEvolutionStrategy:
+    """
+    The CMAEvolutionStrategy class searches the heuristic weights with CMA-ES instead of crossover and mutation,
+    evaluating every generation with a PopulationEvaluator.
+    """
+
+    def __init__(self, generations=10, population_size=None, mean=INITIAL_MEAN, sigma=Definitions.CMA_SIGMA,
+                 fitness_threshold=float('inf'), seed=None, population_evaluator: PopulationEvaluator = None):
+        """
+        Initialize the evolution strategy.
+
+        :param generations: The maximum number of generations.
+        :param population_size: The number of samples every generation, 4 + 3 ln(weights) if None.
+        :param mean: The initial mean of the weights.
+        :param sigma: The initial step size.
+        :param fitness_threshold: The fitness at which the search stops early.
+        :param seed: Seed of the sample generator, a fresh random seed is used if None.
+        :param population_evaluator: The evaluator of every generation, a PopulationEvaluator if None.
+        """
+        self.mean = np.array(mean, dtype=float)
+        self.dimension = n = len(self.mean)
+        self.sigma = sigma
+        self.population_size = population_size or 4 + int(3 * math.log(n))
+        self.termination_checker = GenerationTerminationChecker(generations_limit=generations,
+                                                                fitness_threshold=fitness_threshold)
+        self.rng = np.random.default_rng(seed)
+        self.population_evaluator = population_evaluator or PopulationEvaluator()
+        self.creator = WeightCreator(self.population_size, fitness_type=SimpleFitness)
+        self.logger = logging.getLogger(__name__)
+
+        # Recombination weights of the best half of the samples
+        self.parents = self.population_size // 2
+        recombination = math.log(self.parents + 0.5) - np.log(np.arange(1, self.parents + 1))
+        self.recombination = recombination / recombination.sum()
+        self.effective_parents = 1 / np.sum(self.recombination ** 2)
+
+        # Learning rates of the evolution paths, the covariance matrix and the step size
+        mu_eff = self.effective_parents
+        self.cc = (4 + mu_eff / n) / (n + 4 + 2 * mu_eff / n)
+        self.cs = (mu_eff + 2) / (n + mu_eff + 5)
+        self.c1 = 2 / ((n + 1.3) ** 2 + mu_eff)
+        self.cmu = min(1 - self.c1, 2 * (mu_eff - 2 + 1 / mu_eff) / ((n + 2) ** 2 + mu_eff))
+        self.damps = 1 + 2 * max(0.0, math.sqrt((mu_eff - 1) / (n + 1)) - 1) + self.cs
+        self.chi_n = math.sqrt(n) * (1 - 1 / (4 * n) + 1 / (21 * n ** 2))
+
+        self.pc = np.zeros(n)
+        self.ps = np.zeros(n)
+        self.covariance = np.eye(n)
+        self.axes = np.eye(n)
+        self.scales = np.ones(n)
+        self.generation = 0
+        self.best_individual = None
+
+    def ask(self) -> np.ndarray:
+        """
+        Sample the weights of a generation.
+
+        :return: The weights of every sample, shape (population_size, weights).
+        """
+        z = self.rng.standard_normal((self.population_size, self.dimension))
+        return self.mean + self.sigma * (z * self.scales) @ self.axes.T
+
+    def tell(self, samples: np.ndarray, fitness_scores: np.ndarray):
+        """
+        Move the distribution towards the best samples of a generation.
+
+        :param samples: The weights of every sample, as returned by ask.
+        :param fitness_scores: The fitness of every sample, higher is better.
+        """
+        n = self.dimension
+        best = samples[np.argsort(-np.asarray(fitness_scores), kind='stable')[:self.parents]]
+        old_mean = self.mean
+        self.mean = self.recombination @ best
+        step = (self.mean - old_mean) / self.sigma
+
+        # Evolution paths of the step size (in the whitened space) and of the covariance
+        inverse_sqrt = self.axes @ np.diag(1 / self.scales) @ self.axes.T
+        ps_rate = math.sqrt(self.cs * (2 - self.cs) * self.effective_parents)
+        self.ps = (1 - self.cs) * self.ps + ps_rate * inverse_sqrt @ step
+        ps_norm = np.linalg.norm(self.ps)
+        # The covariance path stalls while the step size path is long, so the covariance does not grow too fast
+        ps_expected = math.sqrt(1 - (1 - self.cs) ** (2 * (self.generation + 1))) * self.chi_n
+        h_sigma = 1.0 if ps_norm / ps_expected < 1.4 + 2 / (n + 1) else 0.0
+        pc_rate = math.sqrt(self.cc * (2 - self.cc) * self.effective_parents)
+        self.pc = (1 - self.cc) * self.pc + h_sigma * pc_rate * step
+
+        # Rank-one update from the path and rank-mu update from the best samples
+        deviations = (best - old_mean) / self.sigma
+        self.covariance = ((1 - self.c1 - self.cmu) * self.covariance
+                           + self.c1 * (np.outer(self.pc, self.pc)
+                                        + (1 - h_sigma) * self.cc * (2 - self.cc) * self.covariance)
+                           + self.cmu * deviations.T @ np.diag(self.recombination) @ deviations)
+        self.sigma *= math.exp(self.cs / self.damps * (ps_norm / self.chi_n - 1))
+
+        # The covariance is symmetric, its eigenvectors are the sampling axes
+        self.covariance = np.triu(self.covariance) + np.triu(self.covariance, 1).T
+        eigenvalues, self.axes = np.linalg.eigh(self.covariance)
+        self.scales = np.sqrt(np.maximum(eigenvalues, 1e-20))
+        self.generation += 1
+
+    def _population(self, samples: np.ndarray) -> Population:
+        """
+        Wrap the samples of a generation as a population of weight individuals.
+
+        :param samples: The weights of every sample.
+        :return: The population.
+        """
+        individuals = self.creator.create_individuals(len(samples))
+        for individual, weights in zip(individuals, samples):
+            individual.weights = weights.tolist()
+        # The samples are not bred by eckity, so the subpopulation has no operators
+        return Population([Subpopulation(Evaluator(), creators=self.creator, operators_sequence=[],
+                                         population_size=len(individuals), individuals=individuals,
+                                         higher_is_better=True)])
+
+    def run(self) -> WeightIndividual:
+        """
+        Run the evolution strategy until a termination setting is met.
+
+        :return: The best individual evaluated.
+        """
+        with self.population_evaluator:
+            while True:
+                samples = self.ask()
+                population = self._population(samples)
+                best_of_generation = self.population_evaluator.act(population)
+                individuals = population.sub_populations[0].individuals
+                self.tell(samples, np.array([individual.get_pure_fitness() for individual in individuals]))
+
+                if self.best_individual is None or best_of_generation.better_than(self.best_individual):
+                    self.best_individual = best_of_generation
+                self.logger.info(f"Generation {self.generation}: best {best_of_generation.get_pure_fitness()}, "
+                                 f"sigma {self.sigma:.4f}, mean {self.mean.tolist()}")
+
+                if self.termination_checker.should_terminate(population, self.best_individual, self.generation):
+                    break
+
+        self.logger.info(f"Best weights: {self.best_individual.weights}")
+        return self.best_individual
@@ -0,0 +1,214 @@
+import gzip
+import logging
+import os
+import pickle
+import random
+import tempfile
+
+from eckity.algorithms.simple_evolution import SimpleEvolution
+from eckity.event_based_operator import Operator
+
+from Gameplay import Definitions
+
+# Version of the checkpoint layout, bumped when the saved state changes
+CHECKPOINT_VERSION = 4
+
+
+def save_checkpoint(path, state: dict):
+    """
+    Write a checkpoint atomically: the state is written to a temporary file in the same directory, flushed to disk
+    and renamed over the previous checkpoint, so a run stopped at any moment leaves either checkpoint intact.
+
+    :param path: The path of the checkpoint file.
+    :param state: The state to save, any picklable dictionary.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    descriptor, temporary_path = tempfile.mkstemp(dir=directory, prefix='.checkpoint-')
+    try:
+        with os.fdopen(descriptor, 'wb') as file:
+            with gzip.GzipFile(fileobj=file, mode='wb') as compressed:
+                pickle.dump(state, compressed, protocol=pickle.HIGHEST_PROTOCOL)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary_path, path)
+    except BaseException:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        raise
+
+
+def load_checkpoint(path) -> dict:
+    """
+    Read a checkpoint written by save_checkpoint.
+
+    :param path: The path of the checkpoint file.
+    :return: The saved state.
+    """
+    with gzip.open(path, 'rb') as file:
+        state = pickle.load(file)
+    if state.get('version') != CHECKPOINT_VERSION:
+        raise ValueError(f"Unsupported checkpoint version {state.get('version')} in {path}.")
+    return state
+
+
+class Checkpointer:
+    """
+    The Checkpointer class saves the state of an evolution every few generations, for ResumableEvolution.
+    """
+
+    def __init__(self, path, interval=Definitions.CHECKPOINT_INTERVAL, history=None):
+        """
+        Initialize the checkpointer.
+
+        :param path: The path of the checkpoint file.
+        :param interval: The number of generations between two checkpoints.
+        :param history: The fitness history of the generations before a resumed run (optional).
+        """
+        self.path = path
+        self.interval = interval
+        self.history = list(history or [])
+        self.logger = logging.getLogger(__name__)
+
+    def register(self, algorithm: SimpleEvolution):
+        """
+        Save checkpoints of an evolution.
+
+        :param algorithm: The evolution.
+        """
+        algorithm.register('init', lambda sender, _: self.save(sender, -1))
+        algorithm.register('after_generation', self.after_generation)
+        algorithm.register('evolution_finished', lambda sender, _: self.save(sender, sender.generation_num))
+
+    def after_generation(self, algorithm: SimpleEvolution, _):
+        """
+        Record the fitness of a generation, and save a checkpoint every interval generations.
+
+        :param algorithm: The evolution.
+        :param _: The event data (unused).
+        """
+        individuals = algorithm.population.sub_populations[0].individuals
+        fitness_scores = [individual.get_pure_fitness() for individual in individuals]
+        self.history.append({
+            'generation': algorithm.generation_num,
+            'best': max(fitness_scores),
+            'average': sum(fitness_scores) / len(fitness_scores),
+            'worst': min(fitness_scores)
+        })
+        if (algorithm.generation_num + 1) % self.interval == 0:
+            self.save(algorithm, algorithm.generation_num)
+
+    @staticmethod
+    def _individual_state(individual) -> dict:
+        """
+        Get the state of an individual.
+
+        :param individual: The individual.
+        :return: Its weights, fitness and game statistics.
+        """
+        return {
+            'weights': list(individual.weights),
+            'fitness': individual.get_pure_fitness() if individual.fitness.is_fitness_evaluated() else None,
+            'game_statistics': getattr(individual, 'game_statistics', None)
+        }
+
+    def save(self, algorithm: SimpleEvolution, generation):
+        """
+        Save a checkpoint of an evolution.
+
+        :param algorithm: The evolution.
+        :param generation: The last generation completed, -1 for the initial population.
+        """
+        state = {
+            'version': CHECKPOINT_VERSION,
+            'generation': generation,
+            'population': [self._individual_state(individual)
+                           for individual in algorithm.population.sub_populations[0].individuals],
+            'best_of_run': self._individual_state(algorithm.best_of_run_),
+            'random_state': algorithm.random_generator.getstate(),
+            'evaluator_state': algorithm.population_evaluator.get_state(),
+            'history': self.history
+        }
+        save_checkpoint(self.path, state)
+        self.logger.info(f"Saved checkpoint of generation {generation} to {self.path}")
+
+
+class ResumableEvolution(SimpleEvolution):
+    """
+    A SimpleEvolution that can continue from a checkpoint saved by Checkpointer, drawing the same numbers
+    the uninterrupted run would have.
+    """
+
+    def __init__(self, *args, checkpoint: dict = None, **kwargs):
+        """
+        Initialize the evolution.
+
+        :param args: The arguments of SimpleEvolution.
+        :param checkpoint: The state loaded from a checkpoint, a new run starts if None.
+        :param kwargs: The keyword arguments of SimpleEvolution.
+        """
+        super().__init__(*args, **kwargs)
+        self.checkpoint = checkpoint
+        self.start_generation = 0
+
+    def initialize(self):
+        """
+        Initialize the evolution, from the checkpoint if there is one.
+        """
+        if self.checkpoint is None:
+            super().initialize()
+            return
+
+        # Like Algorithm.initialize, without creating and evaluating a new population
+        self.population_evaluator.set_executor(self.executor)
+        for field in self.__dict__.values():
+            if isinstance(field, Operator):
+                field.initialize()
+
+        self.create_population()
+        sub_population = self.population.sub_populations[0]
+        sub_population.individuals = [self._restore_individual(sub_population, state)
+                                      for state in self.checkpoint['population']]
+        self.best_of_run_ = self._restore_individual(sub_population, self.checkpoint['best_of_run'])
+        self.population_evaluator.set_state(self.checkpoint['evaluator_state'])
+        self.random_generator.setstate(self.checkpoint['random_state'])
+        self.generation_num = self.checkpoint['generation']
+        self.start_generation = self.checkpoint['generation'] + 1
+
+        for stat in self.statistics:
+            self.register('after_generation', stat.write_statistics)
+
+    @staticmethod
+    def _restore_individual(sub_population, state: dict):
+        """
+        Rebuild an individual of a subpopulation from its saved state.
+
+        :param sub_population: The subpopulation, whose creator builds the individual.
+        :param state: The saved weights, fitness and game statistics.
+        :return: The individual.
+        """
+        individual = sub_population.creators[0].create_individuals(1, sub_population.higher_is_better)[0]
+        individual.weights = list(state['weights'])
+        if state['fitness'] is not None:
+            individual.fitness.set_fitness(state['fitness'])
+        if state['game_statistics'] is not None:
+            individual.game_statistics = state['game_statistics']
+        return individual
+
+    def evolve_main_loop(self):
+        """
+        Performs the evolutionary main loop, from the generation after the checkpoint.
+        """
+        for gen in range(self.start_generation, self.max_generation):
+            self.generation_num = gen
+
+            self.set_generation_seed(self.next_seed())
+            self.generation_iteration(gen)
+            if self.termination_checker.should_terminate(self.population,
+                                                         self.best_of_run_,
+                                                         self.generation_num):
+                self.final_generation_ = gen
+                self.publish('after_generation')
+                break
+            self.publish('after_generation')
+
+        self.executor.shutdown()
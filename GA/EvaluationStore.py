@@ -0,0 +1,161 @@
+import json
+import sqlite3
+import time
+
+from GA.FitnessCache import FitnessCache
+from GA.LookupCounter import LookupCounter
+from Gameplay import Definitions
+
+# The games table, one row per game played by a weight vector on a seed, with a search method, a board size
+# and a placement budget
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    weights TEXT NOT NULL,
+    search_method TEXT NOT NULL,
+    board_width INTEGER NOT NULL,
+    board_height INTEGER NOT NULL,
+    seed INTEGER NOT NULL,
+    max_placements REAL NOT NULL,
+    score INTEGER NOT NULL,
+    lines INTEGER NOT NULL,
+    placements INTEGER NOT NULL,
+    stopped_by TEXT,
+    seconds REAL NOT NULL,
+    played_at REAL NOT NULL,
+    PRIMARY KEY (weights, search_method, board_width, board_height, seed, max_placements)
+)
+"""
+
+
+class EvaluationStore(LookupCounter):
+    """
+    The EvaluationStore class keeps the seeded games played by weight vectors in a SQLite file shared by every run
+    and island, so a stored game is not played again.
+    """
+
+    def __init__(self, path=Definitions.EVALUATION_STORE_PATH, search_method=Definitions.GA_SEARCH_METHOD,
+                 board_size=(Definitions.BOARD_WIDTH, Definitions.BOARD_HEIGHT)):
+        """
+        Open the store, creating the file if it does not exist.
+
+        :param path: The path of the SQLite file.
+        :param search_method: The search method of the AI agents playing the games.
+        :param board_size: The (width, height) of the board the games are played on.
+        """
+        super().__init__()
+        self.path = path
+        self.search_method = search_method
+        self.board_width, self.board_height = board_size
+
+        # Islands of one machine write to the same file, the write-ahead log lets them read while another writes
+        self.connection = sqlite3.connect(path, timeout=60)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        with self.connection:
+            self.connection.execute(SCHEMA)
+
+    def close(self):
+        """
+        Close the store.
+        """
+        self.connection.close()
+
+    def __enter__(self):
+        """
+        Use the store in a with block.
+
+        :return: The store.
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """
+        Close the store when leaving a with block.
+        """
+        self.close()
+
+    @staticmethod
+    def key(weights) -> str:
+        """
+        Build the stored key of a weight vector, the exact weights as a JSON list.
+
+        :param weights: The heuristic weights.
+        :return: The JSON text of the weights.
+        """
+        return json.dumps(list(FitnessCache.key(weights)))
+
+    def _configuration(self) -> tuple:
+        """
+        Get the search method and board size every game of the store is looked up with.
+
+        :return: A tuple (search method, board width, board height).
+        """
+        return self.search_method, self.board_width, self.board_height
+
+    def get(self, weights, seed, max_placements=float('inf')) -> tuple[int, float, str | None, int, int] | None:
+        """
+        Look up a game.
+
+        :param weights: The heuristic weights.
+        :param seed: Seed of the shape sequence.
+        :param max_placements: The maximum number of shapes placed in the game.
+        :return: A tuple (score, seconds, stopped by, placements, lines) of the game, or None if it was not played yet.
+        """
+        row = self.connection.execute(
+            "SELECT score, seconds, stopped_by, placements, lines FROM games WHERE weights = ? AND search_method = ? "
+            "AND board_width = ? AND board_height = ? AND seed = ? AND max_placements = ?",
+            (self.key(weights), *self._configuration(), seed, max_placements)
+        ).fetchone()
+        self.count(row is not None)
+        return row
+
+    def put(self, weights, seed, game, max_placements=float('inf')):
+        """
+        Store a played game, unless the time budget stopped it.
+
+        :param weights: The heuristic weights.
+        :param seed: Seed of the shape sequence.
+        :param game: The (score, seconds, stopped by, placements, lines) of the game, as returned by
+                     Evaluator.play_game.
+        :param max_placements: The maximum number of shapes placed in the game.
+        """
+        score, seconds, stopped_by, placements, lines = game
+        if stopped_by == 'seconds':
+            return
+
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO games VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (self.key(weights), *self._configuration(), seed, max_placements, score, lines, placements,
+                 stopped_by, seconds, time.time())
+            )
+
+    def __len__(self) -> int:
+        """
+        Get the number of games stored with the search method and board size of the store.
+
+        :return: The number of games.
+        """
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM games WHERE search_method = ? AND board_width = ? AND board_height = ?",
+            self._configuration()
+        ).fetchone()[0]
+
+    def best_weights(self, limit=10, min_games=1, max_placements=Definitions.GAME_MAX_PLACEMENTS) -> list[dict]:
+        """
+        Query the weight vectors with the highest mean score over their stored games.
+
+        :param limit: The number of weight vectors.
+        :param min_games: The number of games a weight vector must have played to be listed.
+        :param max_placements: The placement budget of the games.
+        :return: A list of dictionaries with the weights, the number of games, and the mean score, cleared lines
+                 and placements of the games, best first.
+        """
+        rows = self.connection.execute(
+            "SELECT weights, COUNT(*), AVG(score), AVG(lines), AVG(placements) FROM games "
+            "WHERE search_method = ? AND board_width = ? AND board_height = ? AND max_placements = ? "
+            "GROUP BY weights HAVING COUNT(*) >= ? ORDER BY AVG(score) DESC LIMIT ?",
+            (*self._configuration(), max_placements, min_games, limit)
+        ).fetchall()
+        return [{'weights': json.loads(weights), 'games': games, 'score': score, 'lines': lines,
+                 'placements': placements}
+                for weights, games, score, lines, placements in rows]
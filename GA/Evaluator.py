@@ -1,6 +1,11 @@
+import time
+
 from eckity.evaluators.simple_individual_evaluator import SimpleIndividualEvaluator
 
-from Gameplay.AIGameSimulator import run_tetris_game
+from Gameplay import Definitions
+from Gameplay.AIGameSimulator import play_tetris_game
+from Gameplay.BitTable import TABLE_ENGINES
+from Gameplay.VectorizedGameSimulator import play_tetris_games
 from AIPlayer.AIAgent import AIAgent
 
 class Evaluator(SimpleIndividualEvaluator):
@@ -17,22 +22,129 @@ class Evaluator(SimpleIndividualEvaluator):
 
 
     @staticmethod
-    def evaluate_individual(individual ,rounds = 5) -> float:
+    def evaluate_individual(individual ,rounds = 5, seeds = None, max_placements = float('inf'),
+                            max_seconds = float('inf'), store = None) -> float:
         """
         Evaluate an individual's fitness by simulating Tetris games and measuring performance.
 
         :param individual: The individual to be evaluated.
         :param rounds: The number of Tetris games to simulate for averaging the score (default: 5).
-        :return: The average score achieved by the AI agent across multiple rounds.
+        :param seeds: Shape sequence seed of every game (optional). When given, one game is played per seed,
+                      so individuals evaluated with the same seeds play the same shape sequences.
+        :param max_placements: The maximum number of shapes to place in every game (optional).
+        :param max_seconds: The maximum number of seconds every game may take (optional).
+        :param store: An EvaluationStore the seeded games are looked up in and saved to (optional).
+        :return: The average (survival adjusted) score achieved by the AI agent across multiple rounds.
+        """
+        if seeds is None:
+            seeds = [None] * rounds
+        fitness, _ = Evaluator.play_games(individual.weights, seeds, max_placements, max_seconds, store)
+        return fitness
+
+    @staticmethod
+    def play_games(weights, seeds, max_placements=float('inf'), max_seconds=float('inf'),
+                   store=None, table_engine=Definitions.TABLE_ENGINE) -> tuple[float, dict]:
+        """
+        Play one Tetris game per seed with the given weights.
+        Only plain values go in and out, so it is cheap to run in a worker process.
+
+        :param weights: The heuristic weights of the AI agent.
+        :param seeds: Shape sequence seed of every game, None entries get a fresh random seed.
+        :param max_placements: The maximum number of shapes to place in every game.
+        :param max_seconds: The maximum number of seconds every game may take.
+        :param store: An EvaluationStore the seeded games are looked up in and saved to, so games an earlier run
+                      played are not played again (optional).
+        :param table_engine: The name of the Table engine the games are played on, see TABLE_ENGINES.
+        :return: A tuple containing:
+            - fitness (float): The average survival adjusted score of the games.
+            - statistics (dict): The games statistics, see Evaluator.game_statistics.
+        """
+        games = []
+        for seed in seeds:
+            game = store.get(weights, seed, max_placements) if store is not None and seed is not None else None
+            if game is None:
+                game = Evaluator.play_game(weights, seed, max_placements, max_seconds, table_engine=table_engine)
+                if store is not None and seed is not None:
+                    store.put(weights, seed, game, max_placements)
+            games.append(game)
+        statistics = Evaluator.game_statistics(games)
+        return sum(statistics['fitness']) / len(games), statistics
+
+    @staticmethod
+    def play_game(weights, seed, max_placements=float('inf'), max_seconds=float('inf'),
+                  search_method=Definitions.GA_SEARCH_METHOD,
+                  table_engine=Definitions.TABLE_ENGINE) -> tuple[int, float, str | None, int, int]:
+        """
+        Play a single Tetris game with the given weights.
+
+        :param weights: The heuristic weights of the AI agent.
+        :param seed: Seed of the shape sequence, a fresh random seed is used if None.
+        :param max_placements: The maximum number of shapes to place in the game.
+        :param max_seconds: The maximum number of seconds the game may take.
+        :param search_method: The search method of the AI agent, see AIAgent.
+        :param table_engine: The name of the Table engine the game is played on, see TABLE_ENGINES.
+        :return: A tuple containing the score of the game, the seconds it took, the budget that ended it
+                 ('placements' or 'seconds', None if the game was lost), the number of shapes placed and the number
+                 of lines cleared.
+        """
+        # Use the weights in the Tetris game simulation
+        ai_agent = AIAgent(*weights, search_method=search_method)
+        start_time = time.perf_counter()
+        result = play_tetris_game(ai_agent=ai_agent, max_placements=max_placements, max_seconds=max_seconds,
+                                  table_type=TABLE_ENGINES[table_engine], seed=seed)
+        return (result['score'], time.perf_counter() - start_time, result['stopped_by'], result['placements'],
+                result['lines'])
+
+    @staticmethod
+    def play_games_vectorized(weights, seeds, max_placements=float('inf'),
+                              max_seconds=float('inf')) -> list[tuple[int, float, str | None, int, int]]:
+        """
+        Play many column scan games in lockstep (see VectorizedGameSimulator), every game with its own weights.
+
+        :param weights: The heuristic weights of every game.
+        :param seeds: Seed of the shape sequence of every game.
+        :param max_placements: The maximum number of shapes to place in every game.
+        :param max_seconds: The maximum number of seconds the games may take together.
+        :return: The (score, seconds, stopped by, placements, lines) of every game, like play_game. The time of
+                 the games is shared between them by their placements.
+        """
+        start_time = time.perf_counter()
+        results = play_tetris_games(weights, seeds, max_placements, max_seconds)
+        seconds = time.perf_counter() - start_time
+        placements = max(sum(result['placements'] for result in results), 1)
+        return [(result['score'], seconds * result['placements'] / placements, result['stopped_by'],
+                 result['placements'], result['lines'])
+                for result in results]
+
+    @staticmethod
+    def game_fitness(score, stopped_by, placements) -> float:
+        """
+        Get the fitness of a game. A game a budget ended was not lost, so its score is extrapolated at its
+        score rate per placement over the placements played plus a survival bonus.
+
+        :param score: The score of the game.
+        :param stopped_by: The budget that ended the game, None if the game was lost.
+        :param placements: The number of shapes placed.
+        :return: The fitness of the game.
         """
-        # Use individual weights in the Tetris game simulation
-        weights = individual.weights
-        ai_agent = AIAgent(*weights)
+        if stopped_by is None or placements == 0:
+            return score
+        return score / placements * (placements + Definitions.TRUNCATED_SURVIVAL_BONUS)
 
-        # Simulate the game and return the score
-        avg_score = 0
-        for i in range(rounds):
-            avg_score += run_tetris_game(ai_agent=ai_agent)
-            # avg_score += run_tetris_game_with_graphics(ai_agent=ai_agent)
-        return avg_score/rounds # Return a fitness metric (e.g. average score)
+    @staticmethod
+    def game_statistics(games) -> dict:
+        """
+        Summarize the games of an individual.
 
+        :param games: The (score, seconds, stopped by, placements, lines) of every game, as returned by play_game.
+        :return: Dictionary with the score, fitness, truncated flag and cleared lines of every game and the seconds
+                 all the games took.
+        """
+        return {
+            'scores': [score for score, _, _, _, _ in games],
+            'fitness': [Evaluator.game_fitness(score, stopped_by, placements)
+                        for score, _, stopped_by, placements, _ in games],
+            'truncated': [stopped_by is not None for _, _, stopped_by, _, _ in games],
+            'lines': [lines for _, _, _, _, lines in games],
+            'seconds': sum(seconds for _, seconds, _, _, _ in games)
+        }
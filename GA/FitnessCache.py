@@ -0,0 +1,79 @@
+from GA.LookupCounter import LookupCounter
+
+
+class FitnessCache(LookupCounter):
+    """
+    The FitnessCache class remembers the seeded games played by every weight vector during a run,
+    so they are never replayed.
+    """
+
+    def __init__(self):
+        """
+        Initialize an empty cache.
+        """
+        super().__init__()
+        self.games = {}  # weights -> {(seed, max_placements): (score, seconds, stopped by, placements, lines)}
+        self.generations = {}  # weights -> number of generations the weights were evaluated in
+
+    @staticmethod
+    def key(weights) -> tuple[float, ...]:
+        """
+        Build the cache key of a weight vector, the exact weights.
+
+        :param weights: The heuristic weights.
+        :return: The weights as a tuple of floats.
+        """
+        return tuple(float(weight) for weight in weights)
+
+    def get(self, weights, seed, max_placements=float('inf')) -> tuple[int, float, str | None, int, int] | None:
+        """
+        Look up a game.
+
+        :param weights: The heuristic weights.
+        :param seed: Seed of the shape sequence.
+        :param max_placements: The maximum number of shapes placed in the game.
+        :return: A tuple (score, seconds, stopped by, placements, lines) of the game, or None if it was not played yet.
+        """
+        game = self.games.get(self.key(weights), {}).get((seed, max_placements))
+        self.count(game is not None)
+        return game
+
+    def put(self, weights, seed, game, max_placements=float('inf')):
+        """
+        Store a played game, unless the time budget stopped it.
+
+        :param weights: The heuristic weights.
+        :param seed: Seed of the shape sequence.
+        :param game: The (score, seconds, stopped by, placements, lines) of the game, as returned by
+                     Evaluator.play_game.
+        :param max_placements: The maximum number of shapes placed in the game.
+        """
+        if game[2] == 'seconds':
+            return
+        self.games.setdefault(self.key(weights), {})[(seed, max_placements)] = tuple(game)
+
+    def __len__(self) -> int:
+        """
+        Get the number of weight vectors with games in the cache.
+
+        :return: The number of weight vectors.
+        """
+        return len(self.games)
+
+    def evaluated_generations(self, weights) -> int:
+        """
+        Get the number of generations the weights were evaluated in.
+
+        :param weights: The heuristic weights.
+        :return: The number of generations.
+        """
+        return self.generations.get(self.key(weights), 0)
+
+    def mark_evaluated(self, weights):
+        """
+        Count a generation in which the weights were evaluated.
+
+        :param weights: The heuristic weights.
+        """
+        key = self.key(weights)
+        self.generations[key] = self.generations.get(key, 0) + 1
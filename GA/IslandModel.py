@@ -0,0 +1,237 @@
+import logging
+import multiprocessing
+import queue
+import threading
+from multiprocessing.connection import Client, Listener
+
+from Gameplay import Definitions
+
+
+def _drain(inbox) -> list:
+    """
+    Take every item waiting in a queue, without blocking.
+
+    :param inbox: A queue.Queue or multiprocessing.Queue.
+    :return: The list of items.
+    """
+    items = []
+    while True:
+        try:
+            items.append(inbox.get_nowait())
+        except queue.Empty:
+            return items
+
+
+class QueueTransport:
+    """
+    The QueueTransport class carries migrants between islands running as processes of one machine,
+    through one inbox queue per island.
+    """
+
+    # The queue type of the inboxes built by QueueTransport.ring
+    queue_type = multiprocessing.Queue
+
+    def __init__(self, island_id, inbox, outboxes):
+        """
+        Initialize the transport of an island.
+
+        :param island_id: The id of the island.
+        :param inbox: The queue the island receives migrants on.
+        :param outboxes: The inbox queues of the destination islands.
+        """
+        self.island_id = island_id
+        self.inbox = inbox
+        self.outboxes = list(outboxes)
+
+    @classmethod
+    def ring(cls, islands) -> list:
+        """
+        Build the transports of islands connected in a ring, every island sending to the next one.
+
+        :param islands: The number of islands.
+        :return: The transport of every island.
+        """
+        inboxes = [cls.queue_type() for _ in range(islands)]
+        return [cls(island_id, inboxes[island_id], [inboxes[(island_id + 1) % islands]] if islands > 1 else [])
+                for island_id in range(islands)]
+
+    def send(self, migrants):
+        """
+        Send migrants to every destination island.
+
+        :param migrants: A list of (weights, fitness) tuples.
+        """
+        for outbox in self.outboxes:
+            outbox.put((self.island_id, migrants))
+
+    def receive(self) -> list:
+        """
+        Take every message waiting in the inbox, without blocking.
+
+        :return: The list of (source island, migrants) messages.
+        """
+        return _drain(self.inbox)
+
+    def close(self):
+        """
+        Release the transport.
+        """
+
+
+class LoopbackTransport(QueueTransport):
+    """
+    The LoopbackTransport class carries migrants between islands in the same process, for tests.
+    """
+
+    queue_type = queue.Queue
+
+
+class SocketTransport:
+    """
+    The SocketTransport class carries migrants between islands on separate machines, over authenticated connections.
+    """
+
+    def __init__(self, island_id, address, peers, authkey: bytes):
+        """
+        Start listening for migrants.
+
+        :param island_id: The id of the island.
+        :param address: The (host, port) the island listens on.
+        :param peers: The (host, port) addresses of the destination islands.
+        :param authkey: The key shared by all the islands.
+        """
+        self.island_id = island_id
+        self.peers = list(peers)
+        self.authkey = authkey
+        self.inbox = queue.Queue()
+        self.logger = logging.getLogger(__name__)
+        self.listener = Listener(address, authkey=authkey)
+        self.closed = False
+        self.thread = threading.Thread(target=self._accept, name="Migration-Listener", daemon=True)
+        self.thread.start()
+
+    def _accept(self):
+        """
+        Accept connections until the transport is closed, putting every received message in the inbox.
+        A connection that fails, like one with a wrong key or one that sends nothing in time, is dropped.
+        """
+        while not self.closed:
+            try:
+                with self.listener.accept() as connection:
+                    if connection.poll(Definitions.MIGRATION_TIMEOUT):
+                        self.inbox.put(connection.recv())
+                    else:
+                        self.logger.warning("Dropped a migration connection that sent nothing")
+            except Exception as e:
+                if not self.closed:
+                    self.logger.warning(f"Failed to receive migrants: {e}")
+
+    def send(self, migrants):
+        """
+        Send migrants to every peer, each from a background thread, so a peer that does not answer cannot stall
+        the evolution. A peer that cannot be reached (not started yet or already done) is skipped.
+
+        :param migrants: A list of (weights, fitness) tuples.
+        """
+        for peer in self.peers:
+            threading.Thread(target=self._send, args=(peer, (self.island_id, migrants)),
+                             name="Migration-Sender", daemon=True).start()
+
+    def _send(self, peer, message):
+        """
+        Send a message to a peer.
+
+        :param peer: The (host, port) address of the peer.
+        :param message: The (source island, migrants) message.
+        """
+        try:
+            with Client(peer, authkey=self.authkey) as connection:
+                connection.send(message)
+        except Exception as e:
+            self.logger.warning(f"Failed to send migrants to {peer}: {e}")
+
+    def receive(self) -> list:
+        """
+        Take every message waiting in the inbox, without blocking.
+
+        :return: The list of (source island, migrants) messages.
+        """
+        return _drain(self.inbox)
+
+    def close(self):
+        """
+        Stop listening for migrants.
+        """
+        self.closed = True
+        self.listener.close()
+
+
+class Migration:
+    """
+    The Migration class sends an island's best individuals to the other islands every few generations,
+    and lets the migrants it receives replace the island's worst individuals.
+    """
+
+    def __init__(self, transport, interval=Definitions.MIGRATION_INTERVAL, migrants=Definitions.MIGRATION_SIZE):
+        """
+        Initialize the migration of an island.
+
+        :param transport: The transport to the other islands (QueueTransport, LoopbackTransport or SocketTransport).
+        :param interval: The number of generations between two sends.
+        :param migrants: The number of best individuals sent every time.
+        """
+        self.transport = transport
+        self.interval = interval
+        self.migrants = migrants
+        self.sent = 0
+        self.received = 0
+        self.logger = logging.getLogger(__name__)
+
+    def __call__(self, algorithm, _):
+        """
+        Migrate after a generation of an island.
+
+        :param algorithm: The evolution algorithm of the island.
+        :param _: The event data (unused).
+        """
+        individuals = algorithm.population.sub_populations[0].individuals
+        if (algorithm.generation_num + 1) % self.interval == 0:
+            self.emigrate(individuals)
+        self.immigrate(individuals)
+
+    def emigrate(self, individuals):
+        """
+        Send the best individuals to the other islands.
+
+        :param individuals: The individuals of the island.
+        """
+        best = sorted(individuals, key=lambda individual: individual.get_pure_fitness(), reverse=True)[:self.migrants]
+        self.transport.send([(list(individual.weights), individual.get_pure_fitness()) for individual in best])
+        self.sent += len(best)
+
+    def immigrate(self, individuals):
+        """
+        Replace the worst individuals of the island with the migrants that arrived, when they are better.
+        Migrants keep the fitness their island evaluated.
+
+        :param individuals: The individuals of the island, modified in place.
+        """
+        migrants = [migrant for _, island_migrants in self.transport.receive() for migrant in island_migrants]
+        joined = 0
+        for weights, fitness in sorted(migrants, key=lambda migrant: migrant[1], reverse=True):
+            worst = min(range(len(individuals)), key=lambda index: individuals[index].get_pure_fitness())
+            if fitness <= individuals[worst].get_pure_fitness():
+                break
+
+            # A clone keeps the individual type and fitness type of the island, without the fitness
+            immigrant = individuals[worst].clone()
+            if immigrant.fitness.is_fitness_evaluated():
+                immigrant.set_fitness_not_evaluated()
+            immigrant.weights = list(weights)
+            immigrant.fitness.set_fitness(fitness)
+            individuals[worst] = immigrant
+            joined += 1
+
+        if migrants:
+            self.received += joined
+            self.logger.info(f"Island {self.transport.island_id}: {joined} of {len(migrants)} migrants joined")
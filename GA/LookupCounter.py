@@ -0,0 +1,36 @@
+class LookupCounter:
+    """
+    The LookupCounter class counts the hits and misses of the lookups of a cache of games.
+    """
+
+    def __init__(self):
+        """
+        Initialize the counters.
+        """
+        self.hits = 0
+        self.misses = 0
+
+    def count(self, found):
+        """
+        Count a lookup.
+
+        :param found: Whether the lookup found what it looked for.
+        """
+        if found:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def get_statistics(self) -> dict:
+        """
+        Return the lookup counters and the size of the cache.
+
+        :return: Dictionary of cache statistics.
+        """
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'size': len(self)
+        }
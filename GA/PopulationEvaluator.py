@@ -1,23 +1,173 @@
+import math
 import multiprocessing
+import os
+
+import numpy as np
 
 from eckity.evaluators.simple_population_evaluator import SimplePopulationEvaluator
 from eckity.population import Population
 
 from GA.Evaluator import Evaluator
+from GA.FitnessCache import FitnessCache
 from GA.Genetics import WeightIndividual
 from Gameplay import Definitions
+from Gameplay.BitTable import TABLE_ENGINES
+from Gameplay.PieceGenerator import generate_seeds
+
+def _play_game_task(task) -> tuple[tuple, tuple[int, float, str | None, int, int]]:
+    """
+    Play one game in a worker process.
+
+    :param task: A tuple (game key, weights, seed, max placements, max seconds, table engine).
+    :return: A tuple (game key, game), where game is the (score, seconds, stopped by, placements, lines) of the game.
+    """
+    game_key, weights, seed, max_placements, max_seconds, table_engine = task
+    return game_key, Evaluator.play_game(weights, seed, max_placements, max_seconds, table_engine=table_engine)
+
+
+def _play_games_batch_task(tasks) -> list[tuple[tuple, tuple[int, float, str | None, int, int]]]:
+    """
+    Play a batch of games in lockstep in a worker process.
+
+    :param tasks: The (game key, weights, seed, max placements, max seconds, table engine) of every game, with the
+                  same budgets. Lockstep games do not play on a Table, so the table engine is not used.
+    :return: The (game key, game) of every game, see _play_game_task.
+    """
+    _, _, _, max_placements, max_seconds, _ = tasks[0]
+    games = Evaluator.play_games_vectorized([task[1] for task in tasks], [task[2] for task in tasks],
+                                            max_placements, max_seconds)
+    return [(task[0], game) for task, game in zip(tasks, games)]
+
 
 class PopulationEvaluator(SimplePopulationEvaluator):
     """
     A population evaluator that evaluates all individuals in a population
     using multiprocessing for faster computation.
+    The worker pool is reused by every generation until the evaluator is closed (use it as a context manager).
     """
 
-    def __init__(self):
+    def __init__(self, rounds=5, common_seeds=True, seed=None, processes=Definitions.PROCESS_NUM,
+                 initializer=None, initargs=(), fixed_seeds=False, use_fitness_cache=True, elite_extra_rounds=0,
+                 max_placements=Definitions.GAME_MAX_PLACEMENTS, max_seconds=Definitions.GAME_MAX_SECONDS,
+                 store=None, vectorized=False, table_engine=Definitions.TABLE_ENGINE):
         """
         Initialize the population evaluator.
+
+        :param rounds: The number of games every individual plays per generation.
+        :param common_seeds: If true, all the individuals of a generation play the same seeded shape sequences
+                             (common random numbers), so their fitness differences come from their weights only.
+        :param seed: Seed of the generator drawing the game seeds, a fresh random seed is used if None.
+        :param processes: The number of worker processes, os.cpu_count() if None.
+        :param initializer: A function every worker process runs when it starts (optional).
+        :param initargs: The arguments of the initializer.
+        :param fixed_seeds: If true, every generation plays the seeds of the first one, so individuals that were
+                            already evaluated are not played again at all.
+        :param use_fitness_cache: If true (and with common seeds), seeded games are never replayed.
+        :param elite_extra_rounds: Extra games weights already evaluated in an earlier generation play every
+                                   generation, refining the fitness of elites instead of replaying it.
+        :param max_placements: The maximum number of shapes to place in every game.
+        :param max_seconds: The maximum number of seconds every game may take. Vectorized, it is the budget of a
+                            whole lockstep batch, which stops all of its games at once.
+        :param store: An EvaluationStore seeded games are looked up in and saved to across runs (optional).
+        :param vectorized: If true, the games are played in lockstep batches, one per worker. They make the column
+                           scan decisions, so the GA search method must be column scan.
+        :param table_engine: The name of the Table engine the games are played on, see TABLE_ENGINES.
         """
+        if vectorized and Definitions.GA_SEARCH_METHOD != 'col_scan':
+            raise ValueError("Vectorized games only play the column scan search method.")
+        if table_engine not in TABLE_ENGINES:
+            raise ValueError(f"Unknown table engine '{table_engine}', expected one of {tuple(TABLE_ENGINES)}.")
         super().__init__()
+        self.rounds = rounds
+        self.common_seeds = common_seeds
+        self.rng = np.random.default_rng(seed)
+        self.fixed_seeds = fixed_seeds
+        self.generation_seeds = None
+        self.fitness_cache = FitnessCache() if use_fitness_cache and common_seeds else None
+        self.elite_extra_rounds = elite_extra_rounds
+        self.extra_seeds = []
+        self.max_placements = max_placements
+        self.max_seconds = max_seconds
+        self.store = store
+        self.vectorized = vectorized
+        self.table_engine = table_engine
+        self.processes = processes or os.cpu_count()
+        self.initializer = initializer
+        self.initargs = initargs
+        self.pool = None
+
+    def start(self):
+        """
+        Start the worker pool, if it is not running yet.
+        """
+        if self.pool is None:
+            self.pool = multiprocessing.Pool(processes=self.processes, initializer=self.initializer,
+                                             initargs=self.initargs)
+
+    def close(self):
+        """
+        Stop the worker pool, waiting for the workers to exit.
+        """
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+    def __enter__(self):
+        """
+        Start the worker pool when entering a with block.
+
+        :return: The population evaluator.
+        """
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """
+        Stop the worker pool when leaving a with block.
+        """
+        self.close()
+
+    def get_state(self) -> dict:
+        """
+        Get the state a resumed run needs to draw the same seeds and reuse the same games.
+
+        :return: Dictionary with the seed generator state, the seeds drawn so far and the fitness cache.
+        """
+        return {
+            'rng': self.rng.bit_generator.state,
+            'generation_seeds': self.generation_seeds,
+            'extra_seeds': self.extra_seeds,
+            'fitness_cache': self.fitness_cache
+        }
+
+    def set_state(self, state: dict):
+        """
+        Restore a state returned by get_state.
+
+        :param state: The saved state.
+        """
+        self.rng.bit_generator.state = state['rng']
+        self.generation_seeds = state['generation_seeds']
+        self.extra_seeds = state['extra_seeds']
+        self.fitness_cache = state['fitness_cache']
+
+    def _individual_seeds(self, individual, seeds) -> list:
+        """
+        Get the seeds of the games an individual is scored on: the generation seeds, plus elite_extra_rounds
+        extra seeds for every earlier generation its weights were evaluated in.
+
+        :param individual: The individual.
+        :param seeds: The seeds of the generation.
+        :return: The list of seeds.
+        """
+        if self.fitness_cache is None or self.elite_extra_rounds == 0:
+            return list(seeds)
+
+        extra = self.fitness_cache.evaluated_generations(individual.weights) * self.elite_extra_rounds
+        if len(self.extra_seeds) < extra:
+            self.extra_seeds += generate_seeds(extra - len(self.extra_seeds), self.rng)
+        return list(seeds) + self.extra_seeds[:extra]
 
     def act(self, payload=None):
         """
@@ -43,10 +193,132 @@ class PopulationEvaluator(SimplePopulationEvaluator):
             individual for sub_pop in population.sub_populations for individual in sub_pop.individuals
         ]
 
-        # Use multiprocessing to evaluate individuals
-        with multiprocessing.Pool(processes=Definitions.PROCESS_NUM) as pool:
-            fitness_scores = pool.map(Evaluator.evaluate_individual, individuals)
+        return self._assign_fitness(individuals, self._evaluate_individuals(individuals))
+
+    def _evaluate_individuals(self, individuals) -> list[float]:
+        """
+        Play the games of some individuals and compute their fitness, recording their game statistics.
+
+        :param individuals: The individuals.
+        :return: The fitness of every individual.
+        """
+        seeds = self._draw_generation_seeds(self.rounds)
+        results = self._play_games(individuals, [self._individual_seeds(individual, seeds) for individual in individuals])
+
+        # Aggregate the games of every individual
+        fitness_scores = []
+        for individual, games in zip(individuals, results):
+            individual.game_statistics = Evaluator.game_statistics(games)
+            fitness_scores.append(sum(individual.game_statistics['fitness']) / len(games))
+
+        self._mark_evaluated(individuals)
+        return fitness_scores
+
+    def _mark_evaluated(self, individuals):
+        """
+        Count the generation in the fitness cache of every distinct weight vector of some individuals.
+
+        :param individuals: The individuals evaluated this generation.
+        """
+        if self.fitness_cache is not None:
+            for weights_key in {FitnessCache.key(individual.weights) for individual in individuals}:
+                self.fitness_cache.mark_evaluated(weights_key)
+
+    def _draw_generation_seeds(self, count) -> list:
+        """
+        Draw the game seeds shared by the whole generation.
+
+        :param count: The number of seeds.
+        :return: The list of seeds, all None without common seeds.
+        """
+        if not self.common_seeds:
+            seeds = [None] * count
+        elif self.fixed_seeds and self.generation_seeds is not None and len(self.generation_seeds) == count:
+            seeds = self.generation_seeds
+        else:
+            seeds = generate_seeds(count, self.rng)
+        self.generation_seeds = seeds
+        return seeds
+
+    def _play_games(self, individuals, individual_seeds, max_placements=float('inf')) -> list[list[tuple]]:
+        """
+        Play the games of some individuals on the worker pool, every distinct game once.
+        Games found in the fitness cache or in the evaluation store are not played again.
+
+        :param individuals: The individuals.
+        :param individual_seeds: The seeds of the games of every individual.
+        :param max_placements: The maximum number of shapes to place in every game, within the placement budget.
+        :return: The (score, seconds, stopped by, placements, lines) of every game of every individual, in seed order.
+        """
+        max_placements = min(max_placements, self.max_placements)
+
+        # The games every individual is scored on, and the games that were not played before
+        individual_games = []
+        games = {}
+        tasks = []
+        expected_seconds = {}
+        for index, (individual, seeds) in enumerate(zip(individuals, individual_seeds)):
+            weights_key = FitnessCache.key(individual.weights)
+            keys = []
+            for game, seed in enumerate(seeds):
+                # Unseeded games are random, so every one of them is played
+                game_key = (weights_key, seed) if seed is not None else (weights_key, index, game)
+                keys.append(game_key)
+                if game_key in games or game_key in expected_seconds:
+                    continue
 
+                cached = None
+                if self.fitness_cache is not None:
+                    cached = self.fitness_cache.get(individual.weights, seed, max_placements)
+                if cached is None and self.store is not None and seed is not None:
+                    cached = self.store.get(individual.weights, seed, max_placements)
+                    if cached is not None and self.fitness_cache is not None:
+                        self.fitness_cache.put(weights_key, seed, cached, max_placements)
+                if cached is not None:
+                    games[game_key] = cached
+                else:
+                    tasks.append((game_key, individual.weights, seed, max_placements, self.max_seconds,
+                                  self.table_engine))
+                    expected_seconds[game_key] = getattr(individual, 'game_statistics', {}).get('seconds', 0.0)
+            individual_games.append(keys)
+
+        self.start()
+        if self.vectorized:
+            # Games on the same seed go to the same batch, where they share the candidates of their first placements
+            tasks.sort(key=lambda task: (task[2] is None, task[2] or 0))
+            size = max(math.ceil(len(tasks) / self.processes), 1)
+            batches = [tasks[start:start + size] for start in range(0, len(tasks), size)]
+            results = (result for batch in self.pool.imap_unordered(_play_games_batch_task, batches)
+                       for result in batch)
+        else:
+            # Every game is its own task, so workers that finish short games pick up the next ones.
+            # Individuals whose games (or whose parents' games) were long last generation start first,
+            # so the longest games do not run alone at the end
+            tasks.sort(key=lambda task: -expected_seconds[task[0]])
+            results = self.pool.imap_unordered(_play_game_task, tasks)
+
+        for game_key, game in results:
+            games[game_key] = game
+
+            # Seeded games, keyed by (weights, seed), are remembered
+            if len(game_key) == 2:
+                weights_key, seed = game_key
+                if self.fitness_cache is not None:
+                    self.fitness_cache.put(weights_key, seed, game, max_placements)
+                if self.store is not None:
+                    self.store.put(weights_key, seed, game, max_placements)
+
+        return [[games[game_key] for game_key in keys] for keys in individual_games]
+
+    @staticmethod
+    def _assign_fitness(individuals, fitness_scores) -> WeightIndividual:
+        """
+        Assign fitness scores to individuals and return the best one.
+
+        :param individuals: The individuals.
+        :param fitness_scores: The fitness of every individual.
+        :return: The individual with the highest fitness.
+        """
         # Assign fitness scores to individuals and track the best one
         best_individual = None
         best_score = float("-inf")
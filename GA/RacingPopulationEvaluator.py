@@ -0,0 +1,113 @@
+import math
+
+import numpy as np
+
+from GA.Evaluator import Evaluator
+from GA.PopulationEvaluator import PopulationEvaluator
+from Gameplay import Definitions
+
+
+class RacingPopulationEvaluator(PopulationEvaluator):
+    """
+    A population evaluator that races the individuals of a generation: individuals out of contention after
+    the short games of a stage are dropped, and only the survivors play all the rounds in full.
+    """
+
+    def __init__(self, rounds=5, stages=Definitions.RACING_STAGES, keep_fraction=Definitions.RACING_KEEP_FRACTION,
+                 confidence=Definitions.RACING_CONFIDENCE, **kwargs):
+        """
+        Initialize the racing population evaluator.
+
+        :param rounds: The number of full games the individuals still in the race after every stage play.
+        :param stages: The (games, max_placements) of every stage before the last one, games are counted from
+                       the first generation seed.
+        :param keep_fraction: The fraction of the contenders whose mean score sets the cut.
+        :param confidence: The number of standard errors an individual's mean may be below the cut.
+        :param kwargs: The arguments of PopulationEvaluator.
+        """
+        super().__init__(rounds=rounds, **kwargs)
+        if any(games > rounds for games, _ in stages):
+            raise ValueError("A racing stage cannot play more games than the rounds.")
+        self.stages = tuple(stages)
+        self.keep_fraction = keep_fraction
+        self.confidence = confidence
+        self.stage_contenders = []
+
+    def _upper_bounds(self, fitness_scores, games) -> np.ndarray:
+        """
+        Get the upper confidence bound of the mean score of every contender.
+        With a single game, the standard deviation of the score is taken as its mean, as for exponentially
+        distributed scores.
+
+        :param fitness_scores: The mean score of every contender.
+        :param games: The fitness of the games of every contender.
+        :return: The upper bounds.
+        """
+        means = np.asarray(fitness_scores, dtype=float)
+        deviations = np.array([np.std(scores, ddof=1) if len(scores) > 1 else abs(np.mean(scores))
+                               for scores in games])
+        counts = np.array([len(scores) for scores in games])
+        return means + self.confidence * deviations / np.sqrt(counts)
+
+    def _cut(self, fitness_scores) -> float:
+        """
+        Get the mean score contenders must be able to reach to go on.
+
+        :param fitness_scores: The mean score of every contender.
+        :return: The mean score of the contender at the keep fraction.
+        """
+        rank = max(math.ceil(len(fitness_scores) * self.keep_fraction), 1) - 1
+        return sorted(fitness_scores, reverse=True)[rank]
+
+    def _evaluate_individuals(self, individuals) -> list[float]:
+        """
+        Race some individuals and compute their fitness, recording their game statistics.
+
+        :param individuals: The individuals.
+        :return: The fitness of every individual.
+        """
+        self.stage_contenders = []
+        if not individuals:
+            return []
+
+        seeds = self._draw_generation_seeds(self.rounds)
+        fitness_scores = [0.0] * len(individuals)
+        statistics = [None] * len(individuals)
+        seconds = [0.0] * len(individuals)
+        contenders = list(range(len(individuals)))
+
+        # The stages, then all the rounds in full for the survivors
+        stages = list(self.stages) + [(self.rounds, float('inf'))]
+        for stage, (games, max_placements) in enumerate(stages):
+            self.stage_contenders.append(len(contenders))
+            racing = [individuals[index] for index in contenders]
+            if stage < len(stages) - 1:
+                stage_seeds = [seeds[:games]] * len(racing)
+            else:
+                stage_seeds = [self._individual_seeds(individual, seeds) for individual in racing]
+            results = self._play_games(racing, stage_seeds, max_placements)
+
+            # Replace the games of the contenders with the games of this stage. Games capped below the placement
+            # budget are scored by their plain score, only games stopped by the budget itself are extrapolated
+            fitness_key = 'scores' if max_placements < self.max_placements else 'fitness'
+            for index, stage_games in zip(contenders, results):
+                statistics[index] = Evaluator.game_statistics(stage_games)
+                seconds[index] += statistics[index]['seconds']
+                statistics[index]['seconds'] = seconds[index]
+                statistics[index]['max_placements'] = min(max_placements, self.max_placements)
+                fitness_scores[index] = sum(statistics[index][fitness_key]) / len(stage_games)
+
+            if stage == len(stages) - 1:
+                break
+
+            # Drop the contenders that cannot reach the cut
+            stage_scores = [fitness_scores[index] for index in contenders]
+            upper_bounds = self._upper_bounds(stage_scores, [statistics[index][fitness_key] for index in contenders])
+            cut = self._cut(stage_scores)
+            contenders = [index for index, upper_bound in zip(contenders, upper_bounds) if upper_bound >= cut]
+
+        for individual, individual_statistics in zip(individuals, statistics):
+            individual.game_statistics = individual_statistics
+
+        self._mark_evaluated(individuals)
+        return fitness_scores
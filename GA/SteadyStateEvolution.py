@@ -0,0 +1,183 @@
+import logging
+import multiprocessing
+import os
+import queue
+import random
+
+import numpy as np
+
+from GA.Evaluator import Evaluator
+from GA.Genetics import WeightCreator, WeightCrossover, WeightMutation, WeightIndividual
+from Gameplay import Definitions
+from Gameplay.PieceGenerator import generate_seeds
+
+# The individual a new offspring replaces in the population
+REPLACEMENTS = ('worst', 'age')
+
+
+def _evaluate_task(task) -> tuple[int, float, dict]:
+    """
+    Play the games of one individual in a worker process.
+
+    :param task: A tuple (individual id, weights, seeds, max placements, max seconds, table engine).
+    :return: A tuple (individual id, fitness, statistics), see Evaluator.play_games.
+    """
+    individual_id, weights, seeds, max_placements, max_seconds, table_engine = task
+    fitness, statistics = Evaluator.play_games(weights, seeds, max_placements, max_seconds,
+                                               table_engine=table_engine)
+    return individual_id, fitness, statistics
+
+
+class SteadyStateEvolution:
+    """
+    The SteadyStateEvolution class evolves the weights without generations: every evaluated individual joins
+    the population at once, and the next offspring is sent to the worker that became free.
+    """
+
+    def __init__(self, creator: WeightCreator, crossover: WeightCrossover, mutation: WeightMutation,
+                 population_size=20, evaluations=200, tournament_size=3,
+                 replacement=Definitions.STEADY_STATE_REPLACEMENT, rounds=5, common_seeds=True, seed=None,
+                 processes=Definitions.PROCESS_NUM, initializer=None, initargs=(),
+                 max_placements=Definitions.GAME_MAX_PLACEMENTS, max_seconds=Definitions.GAME_MAX_SECONDS,
+                 fitness_threshold=float('inf'), table_engine=Definitions.TABLE_ENGINE):
+        """
+        Initialize the steady-state evolution.
+
+        :param creator: The creator of the random individuals of the initial population.
+        :param crossover: The crossover operator applied to every pair of parents.
+        :param mutation: The mutation operator applied to every offspring.
+        :param population_size: The number of individuals in the population.
+        :param evaluations: The number of individuals evaluated, including the initial population.
+        :param tournament_size: The number of individuals competing to be a parent.
+        :param replacement: 'worst' to replace the worst individual when the offspring is at least as good,
+                            'age' to always replace the oldest one.
+        :param rounds: The number of games every individual plays.
+        :param common_seeds: If true, all the individuals play the same seeded shape sequences.
+        :param seed: Seed of the generator drawing the game seeds, a fresh random seed is used if None.
+        :param processes: The number of worker processes, os.cpu_count() if None.
+        :param initializer: A function every worker process runs when it starts (optional).
+        :param initargs: The arguments of the initializer.
+        :param max_placements: The maximum number of shapes to place in every game.
+        :param max_seconds: The maximum number of seconds every game may take.
+        :param fitness_threshold: The fitness at which the evolution stops early.
+        :param table_engine: The name of the Table engine the games are played on, see TABLE_ENGINES.
+        """
+        if replacement not in REPLACEMENTS:
+            raise ValueError(f"Unknown replacement '{replacement}', expected one of {REPLACEMENTS}.")
+
+        self.creator = creator
+        self.crossover = crossover
+        self.mutation = mutation
+        self.population_size = population_size
+        self.evaluations = evaluations
+        self.tournament_size = tournament_size
+        self.replacement = replacement
+        self.seeds = generate_seeds(rounds, np.random.default_rng(seed)) if common_seeds else [None] * rounds
+        self.processes = processes or os.cpu_count()
+        self.initializer = initializer
+        self.initargs = initargs
+        self.max_placements = max_placements
+        self.max_seconds = max_seconds
+        self.fitness_threshold = fitness_threshold
+        self.table_engine = table_engine
+
+        self.population = []
+        self.best_individual = None
+        self.evaluated = 0
+        self.logger = logging.getLogger(__name__)
+
+    def _select_parent(self) -> WeightIndividual:
+        """
+        Pick a parent by tournament from the current population.
+
+        :return: A clone of the tournament winner.
+        """
+        tournament = random.choices(self.population, k=self.tournament_size)
+        return max(tournament, key=lambda individual: individual.get_pure_fitness()).clone()
+
+    def _breed(self, submitted) -> WeightIndividual:
+        """
+        Breed the next individual: a random one for the initial population, or while no individual has returned
+        yet to select parents from, otherwise an offspring of two tournament winners.
+
+        :param submitted: The number of individuals sent to the workers so far.
+        :return: The new, not yet evaluated individual.
+        """
+        if submitted < self.population_size or not self.population:
+            return self.creator.create_individuals(1)[0]
+
+        parents = [self._select_parent(), self._select_parent()]
+        offspring = self.mutation.apply_operator(self.crossover.apply_operator(parents)[:1])[0]
+        if offspring.fitness.is_fitness_evaluated():
+            offspring.set_fitness_not_evaluated()
+        return offspring
+
+    def _insert(self, individual: WeightIndividual):
+        """
+        Add an evaluated individual to the population, replacing another one once the population is full.
+
+        :param individual: The evaluated individual.
+        """
+        if len(self.population) < self.population_size:
+            self.population.append(individual)
+        elif self.replacement == 'age':
+            # The population is kept in order of arrival
+            self.population.pop(0)
+            self.population.append(individual)
+        else:
+            worst = min(range(len(self.population)), key=lambda index: self.population[index].get_pure_fitness())
+            if individual.get_pure_fitness() >= self.population[worst].get_pure_fitness():
+                self.population.pop(worst)
+                self.population.append(individual)
+
+        if self.best_individual is None or individual.get_pure_fitness() > self.best_individual.get_pure_fitness():
+            self.best_individual = individual
+
+    def evolve(self) -> WeightIndividual:
+        """
+        Run the evolution until the evaluation budget is spent or the fitness threshold is reached.
+
+        :return: The best individual evaluated.
+        """
+        results = queue.Queue()
+        in_flight = {}
+        submitted = 0
+
+        with multiprocessing.Pool(processes=self.processes, initializer=self.initializer,
+                                  initargs=self.initargs) as pool:
+
+            def submit():
+                nonlocal submitted
+                individual = self._breed(submitted)
+                in_flight[submitted] = individual
+                pool.apply_async(_evaluate_task,
+                                 ((submitted, individual.weights, self.seeds, self.max_placements, self.max_seconds,
+                                   self.table_engine),),
+                                 callback=results.put, error_callback=results.put)
+                submitted += 1
+
+            # One individual per worker, every returned fitness frees a worker for the next offspring
+            for _ in range(min(self.processes, self.evaluations)):
+                submit()
+
+            while in_flight:
+                result = results.get()
+                if isinstance(result, BaseException):
+                    raise result
+
+                individual_id, fitness, statistics = result
+                individual = in_flight.pop(individual_id)
+                individual.fitness.set_fitness(fitness)
+                individual.game_statistics = statistics
+                self._insert(individual)
+                self.evaluated += 1
+
+                if self.evaluated % self.population_size == 0:
+                    fitness_scores = [member.get_pure_fitness() for member in self.population]
+                    self.logger.info(f"Evaluated {self.evaluated} individuals, best: {max(fitness_scores)}, "
+                                     f"average: {sum(fitness_scores) / len(fitness_scores)}")
+
+                if submitted < self.evaluations and self.best_individual.get_pure_fitness() < self.fitness_threshold:
+                    submit()
+
+        return self.best_individual
@@ -0,0 +1,66 @@
+import numpy as np
+
+from Gameplay import Definitions
+
+
+class SurrogateModel:
+    """
+    The SurrogateModel class predicts the fitness of weights as the distance-weighted mean fitness of the nearest
+    evaluated weights, compared by direction.
+    """
+
+    def __init__(self, neighbours=Definitions.SURROGATE_NEIGHBOURS):
+        """
+        Initialize an empty model.
+
+        :param neighbours: The number of nearest evaluated weights a prediction averages.
+        """
+        self.neighbours = neighbours
+        self.weights = []
+        self.fitness = []
+
+    @staticmethod
+    def normalize(weights) -> np.ndarray:
+        """
+        Normalize weight vectors to unit length.
+
+        :param weights: A weight vector, or a matrix with one weight vector per row.
+        :return: The normalized weights.
+        """
+        weights = np.asarray(weights, dtype=float)
+        norms = np.linalg.norm(weights, axis=-1, keepdims=True)
+        return weights / np.where(norms > 0, norms, 1)
+
+    def __len__(self) -> int:
+        """
+        Get the number of evaluated weights the model knows.
+
+        :return: The number of samples.
+        """
+        return len(self.fitness)
+
+    def add(self, weights, fitness):
+        """
+        Add the fitness of evaluated weights.
+
+        :param weights: The heuristic weights.
+        :param fitness: Their evaluated fitness.
+        """
+        self.weights.append(self.normalize(weights))
+        self.fitness.append(fitness)
+
+    def predict(self, weights) -> np.ndarray:
+        """
+        Predict the fitness of weight vectors.
+
+        :param weights: A matrix with one weight vector per row.
+        :return: The predicted fitness of every weight vector.
+        """
+        if not self.fitness:
+            raise ValueError("The surrogate model has no evaluated weights yet.")
+
+        distances = np.linalg.norm(self.normalize(weights)[:, None, :] - np.array(self.weights)[None, :, :], axis=2)
+        k = min(self.neighbours, len(self.fitness))
+        nearest = np.argsort(distances, axis=1, kind='stable')[:, :k]
+        inverse = 1 / (np.take_along_axis(distances, nearest, axis=1) + 1e-9)
+        return (inverse * np.array(self.fitness)[nearest]).sum(axis=1) / inverse.sum(axis=1)
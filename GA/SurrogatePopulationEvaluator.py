@@ -0,0 +1,165 @@
+import logging
+import math
+
+import numpy as np
+
+from eckity.population import Population
+
+from GA.Genetics import WeightIndividual
+from GA.PopulationEvaluator import PopulationEvaluator
+from GA.RacingPopulationEvaluator import RacingPopulationEvaluator
+from GA.SurrogateModel import SurrogateModel
+from Gameplay import Definitions
+
+
+class SurrogatePopulationEvaluator(PopulationEvaluator):
+    """
+    A population evaluator that only plays the individuals a surrogate model predicts to be competitive, and
+    a random share of the others. The rest get their predicted fitness.
+    """
+
+    def __init__(self, competitive_fraction=Definitions.SURROGATE_COMPETITIVE_FRACTION,
+                 exploration=Definitions.SURROGATE_EXPLORATION, min_samples=Definitions.SURROGATE_MIN_SAMPLES,
+                 neighbours=Definitions.SURROGATE_NEIGHBOURS, **kwargs):
+        """
+        Initialize the surrogate population evaluator.
+
+        :param competitive_fraction: The fraction of the previous generation whose lowest fitness an individual
+                                     must be predicted to reach to be played.
+        :param exploration: The probability an individual predicted not to be competitive is played anyway,
+                            keeping the model and its accuracy measure honest.
+        :param min_samples: The number of played individuals the model needs before it screens any.
+        :param neighbours: The number of nearest played individuals a prediction averages.
+        :param kwargs: The arguments of the population evaluator.
+        """
+        super().__init__(**kwargs)
+        self.competitive_fraction = competitive_fraction
+        self.exploration = exploration
+        self.min_samples = min_samples
+        self.model = SurrogateModel(neighbours)
+        self.previous_fitness = None
+        self.accuracy = []
+        self.logger = logging.getLogger(__name__)
+
+    def get_state(self) -> dict:
+        """
+        Get the state a resumed run needs, including the surrogate model and its accuracy history.
+
+        :return: Dictionary of the evaluator state.
+        """
+        state = super().get_state()
+        state.update({
+            'model': self.model,
+            'previous_fitness': self.previous_fitness,
+            'accuracy': self.accuracy
+        })
+        return state
+
+    def set_state(self, state: dict):
+        """
+        Restore a state returned by get_state.
+
+        :param state: The saved state.
+        """
+        super().set_state(state)
+        self.model = state['model']
+        self.previous_fitness = state['previous_fitness']
+        self.accuracy = state['accuracy']
+
+    def evaluate(self, population: Population) -> WeightIndividual:
+        """
+        Screen and evaluate all individuals in the population using multiprocessing.
+        Assign fitness scores and return the best-performing individual.
+
+        :param population: The population containing individuals to evaluate.
+        :return: The best-performing individual based on fitness scores.
+        """
+        individuals = [
+            individual for sub_pop in population.sub_populations for individual in sub_pop.individuals
+        ]
+
+        # Predict once the model knows enough individuals, otherwise play everyone
+        if len(self.model) >= self.min_samples and self.previous_fitness:
+            predictions = self.model.predict([individual.weights for individual in individuals])
+            ranked = sorted(self.previous_fitness, reverse=True)
+            cut = ranked[max(math.ceil(len(ranked) * self.competitive_fraction), 1) - 1]
+            played = (predictions >= cut) | (self.rng.random(len(individuals)) < self.exploration)
+        else:
+            predictions = None
+            cut = None
+            played = np.ones(len(individuals), dtype=bool)
+
+        fitness_scores = [0.0] * len(individuals)
+        played_individuals = [individual for individual, play in zip(individuals, played) if play]
+        if played_individuals:
+            for index, fitness in zip(np.flatnonzero(played), self._evaluate_individuals(played_individuals)):
+                fitness_scores[index] = fitness
+
+        # The model predicts full-game fitness, so it only learns from individuals whose games were not capped
+        # below the placement budget
+        learned = np.array([play and self._full_fidelity(individual) for individual, play in zip(individuals, played)],
+                           dtype=bool)
+        for index in np.flatnonzero(learned):
+            self.model.add(individuals[index].weights, fitness_scores[index])
+
+        for index in np.flatnonzero(~played):
+            fitness_scores[index] = float(predictions[index])
+            individuals[index].game_statistics = {'scores': [], 'fitness': [], 'truncated': [], 'lines': [],
+                                                  'seconds': 0.0, 'predicted': True}
+
+        if predictions is not None:
+            self._log_accuracy(predictions[learned], np.array(fitness_scores)[learned], cut, int((~played).sum()))
+        self.previous_fitness = fitness_scores
+
+        return self._assign_fitness(individuals, fitness_scores)
+
+    def _full_fidelity(self, individual) -> bool:
+        """
+        Check whether the fitness of a played individual comes from games with the full placement budget.
+
+        :param individual: The individual.
+        :return: True if its games were not capped by a shorter racing stage.
+        """
+        return individual.game_statistics.get('max_placements', self.max_placements) >= self.max_placements
+
+    def _log_accuracy(self, predictions, fitness_scores, cut, screened):
+        """
+        Record and log how well the model predicted the individuals that were played in full.
+
+        :param predictions: The predicted fitness of the individuals played in full.
+        :param fitness_scores: Their fitness.
+        :param cut: The predicted fitness an individual needed to be played.
+        :param screened: The number of individuals that were not played.
+        """
+        errors = np.abs(predictions - fitness_scores)
+
+        # Rank correlation: whether the model orders the individuals like their games do
+        correlation = float('nan')
+        if len(predictions) > 1 and np.ptp(predictions) > 0 and np.ptp(fitness_scores) > 0:
+            prediction_ranks = np.argsort(np.argsort(predictions))
+            fitness_ranks = np.argsort(np.argsort(fitness_scores))
+            correlation = float(np.corrcoef(prediction_ranks, fitness_ranks)[0, 1])
+
+        # Explored individuals predicted below the cut that reached it anyway were screened out wrongly
+        explored = predictions < cut
+        missed = int((fitness_scores[explored] >= cut).sum())
+
+        accuracy = {
+            'played': len(predictions),
+            'screened': screened,
+            'mean_absolute_error': float(errors.mean()) if len(errors) else float('nan'),
+            'rank_correlation': correlation,
+            'explored': int(explored.sum()),
+            'explored_competitive': missed
+        }
+        self.accuracy.append(accuracy)
+        self.logger.info(f"Surrogate: played {accuracy['played']}, screened {screened}, "
+                         f"mean absolute error {accuracy['mean_absolute_error']:.1f}, "
+                         f"rank correlation {correlation:.2f}, "
+                         f"competitive explored {missed} of {accuracy['explored']}")
+
+
+class RacingSurrogatePopulationEvaluator(SurrogatePopulationEvaluator, RacingPopulationEvaluator):
+    """
+    A population evaluator that screens the individuals with the surrogate model and races the ones it plays.
+    """
@@ -2,9 +2,11 @@ import threading
 import builtins
 import multiprocessing
 import logging
+import argparse
+import os
+import random
 from logging.handlers import QueueHandler, QueueListener
 
-from eckity.algorithms.simple_evolution import SimpleEvolution
 from eckity.subpopulation import Subpopulation
 from eckity.breeders.simple_breeder import SimpleBreeder
 from eckity.statistics.best_average_worst_statistics import BestAverageWorstStatistics
@@ -15,6 +17,15 @@ from Genetics import WeightMutation, WeightCrossover, WeightCreator
 from GenerationTerminationChecker import GenerationTerminationChecker
 from Evaluator import Evaluator
 from PopulationEvaluator import PopulationEvaluator
+from RacingPopulationEvaluator import RacingPopulationEvaluator
+from SteadyStateEvolution import SteadyStateEvolution
+from CMAEvolutionStrategy import CMAEvolutionStrategy
+from SurrogatePopulationEvaluator import SurrogatePopulationEvaluator, RacingSurrogatePopulationEvaluator
+from IslandModel import Migration, QueueTransport, SocketTransport
+from Checkpoint import Checkpointer, ResumableEvolution, load_checkpoint
+from EvaluationStore import EvaluationStore
+from Gameplay import Definitions
+from Gameplay.BitTable import TABLE_ENGINES
 
 # Global Variables
 best_weights = None
@@ -61,15 +72,55 @@ class TetrisGeneticAlgorithm:
     It evolves a population of AI agents using selection, crossover, and mutation.
     """
 
-    def __init__(self, population_size: int = 20, generations: int = 10):
+    def __init__(self, population_size: int = 20, generations: int = 10, processes: int = Definitions.PROCESS_NUM,
+                 log_queue: multiprocessing.Queue = None, racing: bool = False, steady_state: bool = False,
+                 migration: Migration = None, random_seed: int = None, surrogate: bool = False,
+                 checkpoint_path: str = None, resume: bool = False, store_path: str = None, vectorized: bool = False,
+                 table_engine: str = Definitions.TABLE_ENGINE, cma: bool = False):
         """
         Initialize the genetic algorithm parameters.
 
         :param population_size: The number of individuals in the population.
         :param generations: The number of generations to evolve the population.
+        :param processes: The number of worker processes evaluating the population, os.cpu_count() if None.
+        :param log_queue: A multiprocessing queue the worker processes log to (optional).
+        :param racing: If true, individuals out of contention after their first (short) games are not played
+                       in full.
+        :param steady_state: If true, evolve without generations: every evaluated individual immediately
+                             replaces one in the population and the next offspring is bred for the free worker.
+                             The run evaluates population_size * generations individuals. It cannot be combined
+                             with racing, the surrogate, migration, checkpoints, the store or vectorized games.
+        :param migration: The migration exchanging individuals with other islands, when the population is
+                          one island of an island GA (optional).
+        :param random_seed: Seed of the evolution's random generator and of the game seeds, the time eckity was
+                            imported (and a fresh random seed) if None.
+        :param surrogate: If true, offspring a surrogate model of the past evaluations predicts not to be
+                          competitive are not played.
+        :param checkpoint_path: The file the state of the run is saved to after every generation (optional).
+        :param resume: If true and the checkpoint file exists, continue the run saved in it.
+        :param store_path: The SQLite file games are reused from and saved to across runs (optional).
+        :param vectorized: If true, every worker plays its share of the games of a generation in lockstep.
+        :param table_engine: The name of the Table engine the games are played on, see TABLE_ENGINES.
+        :param cma: If true, search the weights with CMA-ES instead of crossover and mutation, evaluating every
+                    generation like the GA. It cannot be combined with migration or checkpoints.
         """
+        if steady_state and cma:
+            raise ValueError("Choose either the steady-state evolution or CMA-ES.")
         self.population_size = population_size
         self.generations = generations
+        self.processes = processes
+        self.log_queue = log_queue
+        self.racing = racing
+        self.steady_state = steady_state
+        self.migration = migration
+        self.random_seed = random_seed
+        self.surrogate = surrogate
+        self.checkpoint_path = checkpoint_path
+        self.resume = resume
+        self.store_path = store_path
+        self.vectorized = vectorized
+        self.table_engine = table_engine
+        self.cma = cma
         self.best_individual = None
         self.logger = logging.getLogger(__name__)
 
@@ -79,7 +130,28 @@ class TetrisGeneticAlgorithm:
         The algorithm performs selection, crossover, and mutation to optimize AI performance.
         """
         weight_creator = WeightCreator(self.population_size, fitness_type=SimpleFitness)
-        ga = SimpleEvolution(
+        if self.steady_state:
+            self.run_steady_state(weight_creator)
+            return
+        if self.cma:
+            self.run_cma()
+            return
+
+        # One worker pool evaluates every generation of the run
+        store = EvaluationStore(self.store_path) if self.store_path is not None else None
+        population_evaluator = self._population_evaluator(store)
+
+        checkpoint = None
+        if self.resume and self.checkpoint_path is not None:
+            if os.path.exists(self.checkpoint_path):
+                checkpoint = load_checkpoint(self.checkpoint_path)
+                self.logger.info(f"Resuming after generation {checkpoint['generation']} from {self.checkpoint_path}")
+            else:
+                self.logger.info(f"No checkpoint at {self.checkpoint_path}, starting a new run")
+
+        # Islands evolving in the same run need their own seeds to start from different populations
+        seed_arguments = {'random_seed': self.random_seed} if self.random_seed is not None else {}
+        ga = ResumableEvolution(
             Subpopulation(
                 creators=weight_creator,
                 population_size=self.population_size,
@@ -92,36 +164,136 @@ class TetrisGeneticAlgorithm:
                 selection_methods=[(TournamentSelection(tournament_size=3, higher_is_better=True), 1)],
                 elitism_rate=0.1
             ),
-            population_evaluator=PopulationEvaluator(),
+            population_evaluator=population_evaluator,
             breeder=SimpleBreeder(),
             max_generation=self.generations,
             statistics=BestAverageWorstStatistics(),
             termination_checker=GenerationTerminationChecker(generations_limit=self.generations,
                                                              fitness_threshold=float('inf')),
-            max_workers=1
+            max_workers=1,
+            checkpoint=checkpoint,
+            **seed_arguments
         )
 
-        ga.evolve()
-        self.best_individual = ga.execute()
+        if self.checkpoint_path is not None:
+            Checkpointer(self.checkpoint_path, history=checkpoint['history'] if checkpoint else None).register(ga)
+        if self.migration is not None:
+            ga.register('after_generation', self.migration)
+
+        try:
+            with population_evaluator:
+                ga.evolve()
+                self.best_individual = ga.execute()
+        finally:
+            if store is not None:
+                self.logger.info(f"Evaluation store {self.store_path}: {store.get_statistics()}")
+                store.close()
+        self.logger.info(f"Best weights: {self.best_individual.weights}")
+
+    def _population_evaluator(self, store: EvaluationStore = None) -> PopulationEvaluator:
+        """
+        Create the evaluator of the generations, racing and screening the individuals if the run does.
+
+        :param store: The store games are reused from and saved to (optional).
+        :return: The population evaluator.
+        """
+        if self.surrogate:
+            evaluator_type = RacingSurrogatePopulationEvaluator if self.racing else SurrogatePopulationEvaluator
+        else:
+            evaluator_type = RacingPopulationEvaluator if self.racing else PopulationEvaluator
+        if self.log_queue is not None:
+            return evaluator_type(processes=self.processes, seed=self.random_seed, store=store,
+                                  vectorized=self.vectorized, table_engine=self.table_engine,
+                                  initializer=init_process, initargs=(self.log_queue,))
+        return evaluator_type(processes=self.processes, seed=self.random_seed, store=store,
+                              vectorized=self.vectorized, table_engine=self.table_engine)
+
+    def run_cma(self):
+        """
+        Run CMA-ES with the evaluator and evaluation budget of the generational GA.
+        """
+        if self.migration is not None or self.checkpoint_path is not None:
+            raise ValueError("CMA-ES does not support migration or checkpoints.")
+
+        store = EvaluationStore(self.store_path) if self.store_path is not None else None
+        strategy = CMAEvolutionStrategy(generations=self.generations, population_size=self.population_size,
+                                        seed=self.random_seed, population_evaluator=self._population_evaluator(store))
+        try:
+            self.best_individual = strategy.run()
+        finally:
+            if store is not None:
+                self.logger.info(f"Evaluation store {self.store_path}: {store.get_statistics()}")
+                store.close()
+
+    def run_steady_state(self, weight_creator: WeightCreator):
+        """
+        Run the asynchronous steady-state evolution, with the same operators and evaluation budget as the
+        generational one.
+
+        :param weight_creator: The creator of the initial individuals.
+        """
+        unsupported = {'racing': self.racing, 'surrogate': self.surrogate, 'migration': self.migration is not None,
+                       'checkpoint_path': self.checkpoint_path is not None, 'store_path': self.store_path is not None,
+                       'vectorized': self.vectorized}
+        if any(unsupported.values()):
+            options = ', '.join(name for name, used in unsupported.items() if used)
+            raise ValueError(f"The steady-state evolution does not support {options}.")
+
+        if self.random_seed is not None:
+            random.seed(self.random_seed)
+        initializer, initargs = (init_process, (self.log_queue,)) if self.log_queue is not None else (None, ())
+        evolution = SteadyStateEvolution(
+            creator=weight_creator,
+            crossover=WeightCrossover(probability=0.65, arity=2),
+            mutation=WeightMutation(probability=0.35, arity=10),
+            population_size=self.population_size,
+            evaluations=self.population_size * self.generations,
+            tournament_size=3,
+            seed=self.random_seed,
+            processes=self.processes,
+            initializer=initializer,
+            initargs=initargs,
+            table_engine=self.table_engine
+        )
+        self.best_individual = evolution.evolve()
         self.logger.info(f"Best weights: {self.best_individual.weights}")
 
 
 # ==============================
 # Genetic Algorithm Execution
 # ==============================
-def run_ga():
+def run_ga(log_queue: multiprocessing.Queue = None, migration: Migration = None, islands: int = 1,
+           checkpoint_path: str = None, resume: bool = False, store_path: str = None, options: dict = None):
     """
     Run the genetic algorithm in a separate thread to optimize AI agents.
     It evolves a population and stores the best weights globally.
+
+    :param log_queue: A multiprocessing queue the worker processes log to (optional).
+    :param migration: The migration to other islands, when this population is one island of an island GA (optional).
+    :param islands: The number of islands evolved by processes of this machine, 1 for a single population.
+    :param checkpoint_path: The file the run is saved to, every island adding its id as a suffix (optional).
+    :param resume: If true, continue the run saved in the checkpoint file.
+    :param store_path: The SQLite file games are reused from and saved to across runs (optional).
+    :param options: Further arguments of TetrisGeneticAlgorithm, like racing or vectorized (optional).
     """
     global best_weights
+    options = options or {}
     logger = logging.getLogger(__name__)
     logger.info("Starting Genetic Algorithm...\n")
 
     try:
-        ga = TetrisGeneticAlgorithm(population_size=20, generations=10)
-        ga.run()
-        best_weights = ga.best_individual.weights
+        if islands > 1:
+            best_weights, _ = run_islands(islands, population_size=20, generations=10, log_queue=log_queue,
+                                          checkpoint_path=checkpoint_path, resume=resume, store_path=store_path,
+                                          options=options)
+        else:
+            ga = TetrisGeneticAlgorithm(population_size=20, generations=10, log_queue=log_queue, migration=migration,
+                                        checkpoint_path=checkpoint_path, resume=resume, store_path=store_path,
+                                        **options)
+            ga.run()
+            if migration is not None:
+                migration.transport.close()
+            best_weights = ga.best_individual.weights
         ga_done_event.set()
         logger.info("GA thread completed")
     except Exception as e:
@@ -129,6 +301,89 @@ def run_ga():
         raise
 
 
+def run_island(island_id: int, transport: QueueTransport, population_size: int, generations: int, processes: int,
+               random_seed: int, log_queue: multiprocessing.Queue, results: multiprocessing.Queue,
+               checkpoint_path: str = None, resume: bool = False, store_path: str = None, options: dict = None):
+    """
+    Evolve one island of an island GA in its own process, with its own worker pool.
+
+    :param island_id: The id of the island.
+    :param transport: The transport to the other islands.
+    :param population_size: The number of individuals of the island.
+    :param generations: The number of generations to evolve the island.
+    :param processes: The number of worker processes of the island.
+    :param random_seed: Seed of the island's evolution.
+    :param log_queue: A multiprocessing queue the island logs to (optional).
+    :param results: The queue the island puts its (island id, best weights, best fitness) on.
+    :param checkpoint_path: The file the island is saved to (optional).
+    :param resume: If true, continue the island saved in the checkpoint file.
+    :param store_path: The SQLite file games are reused from and saved to, shared by the islands (optional).
+    :param options: Further arguments of TetrisGeneticAlgorithm (optional).
+    """
+    if log_queue is not None:
+        init_process(log_queue)
+    ga = TetrisGeneticAlgorithm(population_size=population_size, generations=generations, processes=processes,
+                                log_queue=log_queue, migration=Migration(transport), random_seed=random_seed,
+                                checkpoint_path=checkpoint_path, resume=resume, store_path=store_path,
+                                **(options or {}))
+    ga.run()
+    transport.close()
+    results.put((island_id, ga.best_individual.weights, ga.best_individual.get_pure_fitness()))
+
+
+def run_islands(islands: int = Definitions.ISLAND_COUNT, population_size: int = 20, generations: int = 10,
+                processes: int = Definitions.PROCESS_NUM, log_queue: multiprocessing.Queue = None,
+                seed: int = None, checkpoint_path: str = None, resume: bool = False,
+                store_path: str = None, options: dict = None) -> tuple[list[float], float]:
+    """
+    Run an island GA on this machine: every island evolves in its own process, and the islands, connected in a ring,
+    send their best individuals to the next one every few generations.
+
+    :param islands: The number of islands.
+    :param population_size: The number of individuals of every island.
+    :param generations: The number of generations to evolve every island.
+    :param processes: The number of worker processes shared by the islands, os.cpu_count() if None.
+    :param log_queue: A multiprocessing queue the islands log to (optional).
+    :param seed: Seed drawing the seeds of the islands' evolutions, a fresh random seed is used if None.
+    :param checkpoint_path: The file the islands are saved to, every island adding its id as a suffix (optional).
+    :param resume: If true, continue the islands saved in the checkpoint files.
+    :param store_path: The SQLite file games are reused from and saved to, shared by the islands (optional).
+    :param options: Further arguments of TetrisGeneticAlgorithm (optional).
+    :return: A tuple containing the best weights of all the islands and their fitness.
+    """
+    island_processes = max((processes or os.cpu_count()) // islands, 1)
+    rng = random.Random(seed)
+    results = multiprocessing.Queue()
+    workers = [
+        multiprocessing.Process(target=run_island, name=f"Island-{island_id}",
+                                args=(island_id, transport, population_size, generations, island_processes,
+                                      rng.randrange(2 ** 32), log_queue, results,
+                                      f"{checkpoint_path}.{island_id}" if checkpoint_path else None, resume,
+                                      store_path, options))
+        for island_id, transport in enumerate(QueueTransport.ring(islands))
+    ]
+    for worker in workers:
+        worker.start()
+
+    island_results = [results.get() for _ in workers]
+    for worker in workers:
+        worker.join()
+
+    _, weights, fitness = max(island_results, key=lambda result: result[2])
+    return weights, fitness
+
+
+def parse_address(address: str) -> tuple[str, int]:
+    """
+    Parse a host:port address.
+
+    :param address: The address.
+    :return: A tuple (host, port).
+    """
+    host, port = address.rsplit(':', 1)
+    return host, int(port)
+
+
 def init_process(queue: multiprocessing.Queue):
     """
     Initialize logging for new processes by assigning them a logging queue.
@@ -164,30 +419,72 @@ if __name__ == "__main__":
     Main execution block for running the genetic algorithm in a multi-threaded environment.
     It sets up logging, initializes multiprocessing, and starts the genetic algorithm thread.
     """
+    parser = argparse.ArgumentParser(description="Evolve the heuristic weights of the Tetris AI.")
+    parser.add_argument('--islands', type=int, default=1,
+                        help="Number of island populations evolved by processes of this machine.")
+    parser.add_argument('--island-id', type=int, default=0, help="Id of this island in a multi-machine island GA.")
+    parser.add_argument('--listen', type=parse_address,
+                        help="host:port this island receives migrants on, for a multi-machine island GA.")
+    parser.add_argument('--peer', type=parse_address, action='append', default=[],
+                        help="host:port of an island this island sends migrants to (repeatable).")
+    parser.add_argument('--checkpoint',
+                        help="File the generational GA is saved to after every generation "
+                             f"({Definitions.CHECKPOINT_PATH} if not given).")
+    parser.add_argument('--resume', action='store_true', help="Continue the run saved in the checkpoint file.")
+    parser.add_argument('--store', nargs='?', const=Definitions.EVALUATION_STORE_PATH,
+                        help="SQLite file games are reused from and saved to across runs "
+                             f"({Definitions.EVALUATION_STORE_PATH} if no file is given).")
+    parser.add_argument('--vectorized', action='store_true',
+                        help="Play the games of every worker in lockstep (column scan only).")
+    parser.add_argument('--table', choices=tuple(TABLE_ENGINES), default=Definitions.TABLE_ENGINE,
+                        help="Board engine the games are played on.")
+    parser.add_argument('--racing', action='store_true',
+                        help="Stop playing individuals out of contention after their first short games.")
+    parser.add_argument('--surrogate', action='store_true',
+                        help="Do not play offspring a model of the past evaluations predicts not to be competitive.")
+    optimizer = parser.add_mutually_exclusive_group()
+    optimizer.add_argument('--steady-state', action='store_true',
+                           help="Evolve without generations, breeding an offspring for every free worker.")
+    optimizer.add_argument('--cma', action='store_true',
+                           help="Search the weights with CMA-ES instead of crossover and mutation.")
+    args = parser.parse_args()
+    if args.checkpoint is None and not (args.steady_state or args.cma):
+        args.checkpoint = Definitions.CHECKPOINT_PATH
+
     listener, log_queue = setup_logging()
     logger = logging.getLogger(__name__)
 
     try:
         logger.info("Starting main program")
 
-        # Set up multiprocessing with logging support
-        ctx = multiprocessing.get_context('spawn')
-        with ctx.Pool(initializer=init_process, initargs=(log_queue,)) as pool:
-            ga_thread = threading.Thread(target=run_ga, name="GA-Thread")
-            ga_thread.start()
-
-            try:
-                ai_agent = None  # Placeholder for AI agent initialization
+        # Islands on separate machines share a key set in the environment
+        migration = None
+        if args.listen is not None:
+            authkey = os.environ.get('TETRIS_ISLAND_KEY')
+            if not authkey:
+                raise ValueError("Set TETRIS_ISLAND_KEY to the key shared by the islands.")
+            migration = Migration(SocketTransport(args.island_id, args.listen, args.peer, authkey.encode()))
+
+        # The GA starts its own worker pool, with logging support
+        ga_thread = threading.Thread(target=run_ga, name="GA-Thread",
+                                     args=(log_queue, migration, args.islands, args.checkpoint, args.resume,
+                                           args.store,
+                                           {'vectorized': args.vectorized, 'table_engine': args.table,
+                                            'racing': args.racing, 'surrogate': args.surrogate,
+                                            'steady_state': args.steady_state, 'cma': args.cma}))
+        ga_thread.start()
+
+        try:
+            ga_thread.join()
+            logger.info("GA completed!")
+
+        except Exception as e:
+            logger.error(f"Error in main thread: {str(e)}", exc_info=True)
+            raise
+
+        finally:
+            if ga_thread.is_alive():
                 ga_thread.join()
-                logger.info("GA completed!")
-
-            except Exception as e:
-                logger.error(f"Error in main thread: {str(e)}", exc_info=True)
-                raise
-
-            finally:
-                if ga_thread.is_alive():
-                    ga_thread.join()
 
     except Exception as e:
         logger.error(f"An error occurred: {str(e)}", exc_info=True)
@@ -2,28 +2,52 @@ import time
 
 from AIPlayer import AIAgent
 from Gameplay.Table import Table, Definitions
+from Gameplay.BitTable import TABLE_ENGINES
+from Gameplay.PieceGenerator import PieceGenerator
 
 
-def run_tetris_game(ai_agent: AIAgent, max_placements = float('inf')) -> int:
+def run_tetris_game(ai_agent: AIAgent, max_placements = float('inf'), table_type: type[Table] = None, seed = None) -> int:
     """
-    Run a Tetris game with AI only.
+    Run a Tetris game with AI only, without graphics.
+    Every shape is placed at once at the placement the agent chooses.
 
     :param: ai_agent (AIAgent): The AI agent controlling the game.
     :param: max_placements (int): The maximum number of shapes to place (optional).
+    :param: table_type (type): The Table engine to play on, Definitions.TABLE_ENGINE if None (optional).
+    :param: seed (int): Seed of the shape sequence, games with the same seed get the same shapes (optional).
     :return: Final score of the game.
     """
+    return play_tetris_game(ai_agent, max_placements, table_type=table_type, seed=seed)['score']
+
+
+def play_tetris_game(ai_agent: AIAgent, max_placements = float('inf'), max_seconds = float('inf'),
+                     table_type: type[Table] = None, seed = None) -> dict:
+    """
+    Run a Tetris game with AI only, without graphics, within a placement and a time budget.
+    Every shape is placed at once at the placement the agent chooses.
+
+    :param: ai_agent (AIAgent): The AI agent controlling the game.
+    :param: max_placements (int): The maximum number of shapes to place (optional).
+    :param: max_seconds (float): The maximum number of seconds to play (optional).
+    :param: table_type (type): The Table engine to play on, Definitions.TABLE_ENGINE if None (optional).
+    :param: seed (int): Seed of the shape sequence, games with the same seed get the same shapes (optional).
+    :return: Dictionary with the final score, the number of lines cleared, the number of shapes placed, whether
+             a budget ended the game before it was lost and which one ('placements' or 'seconds', None if lost).
+    """
     ai_end_time = None
 
     # Initialize Table Instance for AI
-    ai_table = Table(Definitions.BOARD_HEIGHT, Definitions.BOARD_WIDTH)
+    table_type = table_type or TABLE_ENGINES[Definitions.TABLE_ENGINE]
+    ai_table = table_type(Definitions.BOARD_HEIGHT, Definitions.BOARD_WIDTH, PieceGenerator(seed))
 
     # Initialize scoring and timer
     start_time = time.time()
     ai_score = 0
+    ai_lines = 0
 
     # Spawn initial shape
     ai_table.spawn_next_shape()
-    placements_left = max_placements - 1
+    placements = 0
 
     running = True
 
@@ -31,20 +55,35 @@ def run_tetris_game(ai_agent: AIAgent, max_placements = float('inf')) -> int:
     while running:
         current_time = time.time()
 
-        # AI logic
-        ai_agent.choose_action(ai_table)
+        # AI logic, the chosen placement is committed at once instead of replaying the moves to reach it
+        placement = ai_agent.choose_placement(ai_table)
+        if placement is None or not ai_table.commit_placement(*placement):
+            ai_table.game_over = True
 
-        if ai_table.is_shape_landing():
+        if ai_table.is_shape_landing() and not ai_table.game_over:
             lines_cleaned = ai_table.check_for_cleared_rows()
             if lines_cleaned > 0:
                 ai_score += Definitions.POINTS_PER_LINE[lines_cleaned]
+                ai_lines += lines_cleaned
             ai_table.spawn_next_shape()
-            placements_left -= 1
+            placements += 1
 
-        # Check game over for AI
-        if ai_table.game_over or placements_left == 0:
+        # Check game over for AI, or the end of its budget
+        stopped_by = None
+        if not ai_table.game_over:
+            if placements >= max_placements:
+                stopped_by = 'placements'
+            elif current_time - start_time >= max_seconds:
+                stopped_by = 'seconds'
+        if ai_table.game_over or stopped_by is not None:
             running = False
             ai_end_time = int(current_time - start_time)
             print(f"AI Score: {ai_score}, Time: {ai_end_time}")
 
-    return ai_score
\ No newline at end of file
+    return {
+        'score': ai_score,
+        'lines': ai_lines,
+        'placements': placements,
+        'truncated': stopped_by is not None,
+        'stopped_by': stopped_by
+    }
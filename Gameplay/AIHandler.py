@@ -1,6 +1,6 @@
 import pygame
 from AIPlayer.AIAgent import AIAgent
-from Gameplay.Table import Table
+from Gameplay.BitTable import TABLE_ENGINES
 from Gameplay import Definitions
 
 class AIHandler:
@@ -9,7 +9,7 @@ class AIHandler:
     """
 
     def __init__(self, ai_agent: AIAgent):
-        self.table = Table(Definitions.BOARD_HEIGHT, Definitions.BOARD_WIDTH)
+        self.table = TABLE_ENGINES[Definitions.TABLE_ENGINE](Definitions.BOARD_HEIGHT, Definitions.BOARD_WIDTH)
         self.ai_agent = ai_agent
         self.score = 0
         self.active = True
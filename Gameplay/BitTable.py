@@ -0,0 +1,206 @@
+import numpy as np
+from Gameplay import Definitions
+from Gameplay.Table import Table
+from Gameplay.ShapeOrientations import SHAPE_COLORS, Orientation
+from Gameplay.PieceGenerator import PieceGenerator
+
+# Bits of the shape color of every cell in a row color integer, colors are 1 to 7
+COLOR_BITS = 3
+COLOR_MASK = (1 << COLOR_BITS) - 1
+
+class BitTable(Table):
+    """
+    The BitTable class is a Table engine that stores every board row as integer bitmasks of its occupied cells
+    and shape colors, with the same public API as Table.
+    """
+
+    def __init__(self, rows=Definitions.BOARD_HEIGHT, cols=Definitions.BOARD_WIDTH, shape_generator: PieceGenerator = None):
+        """
+        Initialize the Tetris bit table.
+
+        :param rows: Number of rows on the board.
+        :param cols: Number of columns on the board.
+        :param shape_generator: The source of the spawned shapes, an unseeded PieceGenerator if None.
+        """
+        self.full_row = (1 << cols) - 1
+        self._board_cache = None
+        super().__init__(rows, cols, shape_generator)
+
+    @property
+    def board(self) -> np.ndarray:
+        """
+        Get a numpy view of the board, with the shape color of every occupied cell (0 for an empty one).
+        The view is rebuilt only after the board changed, and is read-only.
+
+        :return: A (rows, cols) numpy array of the board.
+        """
+        if self._board_cache is None:
+            shifts = COLOR_BITS * np.arange(self.cols)
+            self._board_cache = (np.array(self.row_colors, dtype=np.int64)[:, None] >> shifts) & COLOR_MASK
+            self._board_cache.setflags(write=False)
+        return self._board_cache
+
+    @board.setter
+    def board(self, board: np.ndarray):
+        """
+        Load the board from a (rows, cols) numpy array of shape colors, any non-zero cell is occupied.
+
+        :param board: The board to load.
+        """
+        board = np.asarray(board, dtype=np.int64)
+        self.row_masks = [int(mask) for mask in (board != 0) @ (1 << np.arange(self.cols, dtype=np.int64))]
+        self.row_colors = [int(colors) for colors in board @ (1 << COLOR_BITS * np.arange(self.cols, dtype=np.int64))]
+        self._board_cache = None
+        self._recompute_column_statistics()
+
+    def _shape_masks(self, shape, position) -> list[tuple[int, int]] | None:
+        """
+        Convert a shape at a position into (board_row, row_mask) pairs.
+
+        :param shape: The shape matrix.
+        :param position: A tuple (row, col) of the top-left corner.
+        :return: The list of (board_row, row_mask) pairs, or None if the shape is out of the board.
+        """
+        row, col = position
+        masks = []
+        for r in range(shape.shape[0]):
+            mask = 0
+            for c in range(shape.shape[1]):
+                if shape[r, c]:
+                    board_col = col + c
+                    if board_col < 0 or board_col >= self.cols:
+                        return None
+                    mask |= 1 << board_col
+            if mask:
+                board_row = row + r
+                if board_row < 0 or board_row >= self.rows:
+                    return None
+                masks.append((board_row, mask))
+        return masks
+
+    def can_move(self, shape, position) -> bool:
+        """
+        Check if a shape can be moved to a specific position.
+
+        :param shape: The shape to move.
+        :param position: A tuple (row, col) of the top-left corner.
+        :return: True if the shape can be moved, False otherwise.
+        """
+        if shape is None:
+            return True
+
+        masks = self._shape_masks(shape, position)
+        if masks is None:
+            return False
+        for board_row, mask in masks:
+            if self.row_masks[board_row] & mask:
+                return False
+        return True
+
+    def can_place(self, orientation: Orientation, position) -> bool:
+        """
+        Check if a precomputed shape orientation can be placed at a specific position.
+
+        :param orientation: The shape orientation to place.
+        :param position: A tuple (row, col) of the top-left corner.
+        :return: True if the orientation can be placed, False otherwise.
+        """
+        row, col = position
+        if (row + orientation.top < 0 or row + orientation.bottom >= self.rows or
+                col + orientation.left < 0 or col + orientation.right >= self.cols):
+            return False
+
+        row_masks = self.row_masks
+        if col >= 0:
+            for r, mask in orientation.row_masks:
+                if row_masks[row + r] & (mask << col):
+                    return False
+        else:
+            for r, mask in orientation.row_masks:
+                if row_masks[row + r] & (mask >> -col):
+                    return False
+        return True
+
+    def _orientation_masks(self, orientation: Orientation, position) -> list[tuple[int, int]]:
+        """
+        Convert a shape orientation at a valid position into (board_row, row_mask) pairs.
+
+        :param orientation: The shape orientation.
+        :param position: A tuple (row, col) of the top-left corner.
+        :return: The list of (board_row, row_mask) pairs.
+        """
+        row, col = position
+        if col >= 0:
+            return [(row + r, mask << col) for r, mask in orientation.row_masks]
+        return [(row + r, mask >> -col) for r, mask in orientation.row_masks]
+
+    def place_shape(self):
+        """
+        Place the current shape on the board and clear full rows.
+        """
+        orientation = self.current_orientation
+        row = self.shape_position[0]
+        self.holes_before = self.get_holes()
+
+        for board_row, mask in self._orientation_masks(orientation, self.shape_position):
+            self.row_masks[board_row] |= mask
+        color = SHAPE_COLORS[self.current_shape_name]
+        col = self.shape_position[1]
+        for r, c in orientation.cells:
+            self.row_colors[row + r] |= color << COLOR_BITS * (col + c)
+        self._board_cache = None
+        self._add_cells_to_columns(orientation, self.shape_position)
+
+        self.current_shape = None
+        self.current_shape_name = None
+        self.current_orientation = None
+        self._shape_landed = True
+        self._clear_rows(range(row + orientation.top, row + orientation.bottom + 1))
+
+    def _clear_rows(self, candidate_rows=None):
+        """
+        Clear full rows on the board.
+
+        :param candidate_rows: The rows that may have been filled, all rows are checked if not given.
+        """
+        if candidate_rows is None:
+            candidate_rows = range(self.rows)
+
+        full_rows = [r for r in candidate_rows if self.row_masks[r] == self.full_row]
+        if full_rows:
+            self._rows_cleared += len(full_rows)
+            self.row_colors = [0] * len(full_rows) + [colors for colors, mask in zip(self.row_colors, self.row_masks)
+                                                      if mask != self.full_row]
+            self.row_masks = [0] * len(full_rows) + [mask for mask in self.row_masks if mask != self.full_row]
+            self._remove_rows_from_columns(full_rows)
+
+    def _cell_filled(self, row, col) -> bool:
+        """
+        Check if a board cell is occupied.
+
+        :param row: The cell row.
+        :param col: The cell column.
+        :return: True if the cell is occupied, False otherwise.
+        """
+        return (self.row_masks[row] >> col) & 1 == 1
+
+    def _save_board(self) -> tuple[list[int], list[int]]:
+        """
+        Copy the board for a snapshot.
+
+        :return: A tuple (row masks, row colors) of copies.
+        """
+        return self.row_masks.copy(), self.row_colors.copy()
+
+    def _load_board(self, board: tuple[list[int], list[int]]):
+        """
+        Copy a board saved by _save_board back into the board.
+
+        :param board: The saved row masks and row colors.
+        """
+        self.row_masks[:], self.row_colors[:] = board
+        self._board_cache = None
+
+
+# The Table engines AI games can be played on, by name (see Definitions.TABLE_ENGINE)
+TABLE_ENGINES = {'table': Table, 'bit': BitTable}
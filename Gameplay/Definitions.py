@@ -11,7 +11,33 @@ PLAY_WITH_AI = True
 PLAY_WITH_HUMAN = False
 GRAPHICS_ON = True
 AI_PLAY_WITH_GRAPHIC = True
-PROCESS_NUM = 10
+PROCESS_NUM = None # Worker processes evaluating the GA population, None for os.cpu_count()
+LOOKAHEAD_PREVIEW = 1 # Upcoming shapes the lookahead search places after the current one
+LOOKAHEAD_BEAM_WIDTH = 8 # Boards kept after every ply of the lookahead search
+LOOKAHEAD_TIME_BUDGET = 50 # Time in milliseconds a lookahead decision may take, deeper plies are skipped once it runs out
+ANYTIME_DEADLINE = 10 # Time in milliseconds an anytime decision may take, below one AI frame
+ANYTIME_LOOKAHEAD_HEIGHTS = (8, 14) # Max heights from which the anytime search looks 1 and 2 pieces ahead instead of using BFS
+RACING_STAGES = ((1, 250), (2, float('inf'))) # (games, max placements) every racing GA individual plays before a cut, survivors then play all rounds in full
+RACING_KEEP_FRACTION = 0.5 # Fraction of the contenders whose mean score sets the racing cut
+RACING_CONFIDENCE = 1.645 # Standard errors an individual's mean may be below the racing cut and still go on
+GAME_MAX_PLACEMENTS = 20000 # Shapes a GA game may place before it is stopped and its score extrapolated
+GAME_MAX_SECONDS = float('inf') # Seconds a GA game (a whole lockstep batch when vectorized) may take before it is stopped, off by default since it makes fitness machine dependent
+TRUNCATED_SURVIVAL_BONUS = 500 # Placements a stopped GA game is credited beyond the ones it played, at its score rate
+STEADY_STATE_REPLACEMENT = 'worst' # Individual a steady-state GA offspring replaces, 'worst' or 'age' (the oldest)
+ISLAND_COUNT = 4 # Populations evolved side by side by the island GA
+MIGRATION_INTERVAL = 5 # Generations between two migrations of an island's best individuals
+MIGRATION_SIZE = 2 # Best individuals an island sends at every migration
+MIGRATION_TIMEOUT = 10 # Seconds an island waits for the message of an accepted migration connection
+CMA_SIGMA = 0.3 # Initial step size of the CMA-ES weight search
+SURROGATE_COMPETITIVE_FRACTION = 0.5 # Fraction of the previous generation whose lowest fitness an offspring must be predicted to reach to be played
+SURROGATE_EXPLORATION = 0.1 # Probability an offspring predicted not to be competitive is played anyway
+SURROGATE_MIN_SAMPLES = 40 # Played individuals the surrogate model needs before it screens any
+SURROGATE_NEIGHBOURS = 5 # Nearest played individuals a surrogate prediction averages
+CHECKPOINT_PATH = 'ga_checkpoint.pkl.gz' # File the GA saves its state to, and resumes from
+CHECKPOINT_INTERVAL = 1 # Generations between two GA checkpoints
+GA_SEARCH_METHOD = 'col_scan' # Search method of the AI agents the GA evaluates
+TABLE_ENGINE = 'table' # Board engine of the AI games, 'table' (numpy cells) or 'bit' (row bitmasks, see BitTable)
+EVALUATION_STORE_PATH = 'evaluations.sqlite3' # SQLite file the GA games are saved to and reused from across runs, with --store
 
 # Shapes
 SHAPES = {
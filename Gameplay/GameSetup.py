@@ -119,7 +119,9 @@ def main():
         human_process.start()
 
     if ai_choice == ('Y' or 'y'):
-        ai_agent_optimal = AIAgent(-0.147593415829753, -0.16684726563044971, -0.7783947049391171, 0.03811992593777204)
+        # Live play searches within a frame, see Definitions.ANYTIME_DEADLINE
+        ai_agent_optimal = AIAgent(-0.147593415829753, -0.16684726563044971, -0.7783947049391171, 0.03811992593777204,
+                                   search_method="anytime")
         ai_process = Process(target=run_ai_game, args=(ai_agent_optimal,))
         ai_process.start()
 
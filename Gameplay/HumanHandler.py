@@ -25,6 +25,8 @@ class HumanHandler:
             self.table.drop()
         elif keys[pygame.K_UP]:
             self.table.rotate()
+        elif keys[pygame.K_SPACE]:
+            self.table.hard_drop()
 
     def update(self, elapsed_time):
         """Updates the human player's game state."""
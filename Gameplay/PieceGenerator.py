@@ -0,0 +1,75 @@
+from collections import deque
+
+import numpy as np
+from Gameplay import Definitions
+
+class PieceGenerator:
+    """
+    The PieceGenerator class deals the shapes spawned on a Table from shuffled 7-bags, with its own seeded
+    random generator.
+    """
+
+    def __init__(self, seed=None, sequence=None):
+        """
+        Initialize the piece generator.
+
+        :param seed: Seed of the random generator, a fresh random seed is used if None.
+        :param sequence: A precomputed sequence of shape names to deal before the random bags (optional).
+        """
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        self.upcoming = deque(sequence if sequence is not None else [])
+        self.dealt = 0
+
+    def _fill_bag(self):
+        """
+        Shuffle a new bag of all the shapes into the upcoming shapes.
+        """
+        bag = list(Definitions.SHAPES.keys())
+        self.rng.shuffle(bag)
+        self.upcoming.extend(bag)
+
+    def next(self) -> str:
+        """
+        Deal the next shape.
+
+        :return: The name of the next shape.
+        """
+        if not self.upcoming:
+            self._fill_bag()
+        self.dealt += 1
+        return self.upcoming.popleft()
+
+    def peek(self, count) -> list[str]:
+        """
+        Look at the upcoming shapes without dealing them.
+
+        :param count: The number of upcoming shapes.
+        :return: The names of the next count shapes, in dealing order.
+        """
+        while len(self.upcoming) < count:
+            self._fill_bag()
+        return [self.upcoming[i] for i in range(count)]
+
+    @staticmethod
+    def sequence(seed, length) -> list[str]:
+        """
+        Precompute the shapes a generator with the given seed deals.
+
+        :param seed: Seed of the random generator.
+        :param length: The number of shapes.
+        :return: The names of the first length shapes.
+        """
+        return PieceGenerator(seed).peek(length)
+
+
+def generate_seeds(count, rng: np.random.Generator = None) -> list[int]:
+    """
+    Draw seeds for a set of games.
+
+    :param count: The number of seeds.
+    :param rng: The random generator to draw from, a fresh one is used if None.
+    :return: A list of integer seeds.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    return [int(seed) for seed in rng.integers(0, 2 ** 32, size=count)]
@@ -0,0 +1,70 @@
+import numpy as np
+from Gameplay import Definitions
+
+class Orientation:
+    """
+    The Orientation class holds the precomputed geometry of one rotation of a shape.
+    All offsets are relative to the top-left corner of the shape matrix, like Table.shape_position.
+    """
+
+    __slots__ = ('shape_name', 'index', 'degrees', 'matrix', 'cells', 'top', 'bottom', 'left', 'right',
+                 'width', 'height', 'bottom_profile', 'row_masks')
+
+    def __init__(self, shape_name: str, index: int, matrix: np.ndarray):
+        """
+        Build the orientation data from a rotated shape matrix.
+
+        :param shape_name: The name of the shape ('I', 'J', 'L', 'O', 'S', 'Z' or 'T').
+        :param index: The number of counterclockwise rotations from the spawn orientation (0-3).
+        :param matrix: The rotated shape matrix.
+        """
+        self.shape_name = shape_name
+        self.index = index
+        self.degrees = index * 90
+        self.matrix = matrix
+        self.matrix.setflags(write=False)
+
+        # Occupied cells as (row, col) offsets
+        self.cells = tuple((int(r), int(c)) for r, c in zip(*np.nonzero(matrix)))
+        rows = [r for r, _ in self.cells]
+        cols = [c for _, c in self.cells]
+
+        # Bounding box of the occupied cells
+        self.top, self.bottom = min(rows), max(rows)
+        self.left, self.right = min(cols), max(cols)
+        self.width = self.right - self.left + 1
+        self.height = self.bottom - self.top + 1
+
+        # Lowest occupied row offset of every column from left to right
+        self.bottom_profile = tuple(max(r for r, c in self.cells if c == col)
+                                    for col in range(self.left, self.right + 1))
+
+        # (row offset, bitmask) of every occupied row, bit c is set for column offset c
+        self.row_masks = tuple((r, sum(1 << c for rr, c in self.cells if rr == r))
+                               for r in range(self.top, self.bottom + 1))
+
+    def __deepcopy__(self, memo):
+        """
+        Orientations are immutable and shared, so copies of a Table keep pointing to the same instance.
+        """
+        return self
+
+
+def _build_orientations() -> dict[str, tuple[Orientation, ...]]:
+    """
+    Build the four orientations of every shape in Definitions.SHAPES.
+    Orientation i is the spawn matrix rotated i times by 90 degrees counterclockwise, like Table.rotate.
+
+    :return: A dictionary from shape name to its four orientations.
+    """
+    orientations = {}
+    for name, shape in Definitions.SHAPES.items():
+        orientations[name] = tuple(Orientation(name, i, np.rot90(shape, i).copy()) for i in range(4))
+    return orientations
+
+
+# Every orientation of every shape, built once
+ORIENTATIONS = _build_orientations()
+
+# The value a shape leaves on the board when placed (its index in Definitions.COLOR_SHAPES)
+SHAPE_COLORS = {name: i + 1 for i, name in enumerate(Definitions.SHAPES)}
@@ -1,49 +1,47 @@
 import numpy as np
 from Gameplay import Definitions
+from Gameplay.ShapeOrientations import ORIENTATIONS, SHAPE_COLORS, Orientation
+from Gameplay.PieceGenerator import PieceGenerator
 
 class Table:
     """
     The Table class represents the Tetris game board and manages the state of the game.
     """
 
-    def __init__(self, rows=Definitions.BOARD_HEIGHT, cols=Definitions.BOARD_WIDTH):
+    def __init__(self, rows=Definitions.BOARD_HEIGHT, cols=Definitions.BOARD_WIDTH, shape_generator: PieceGenerator = None):
         """
         Initialize the Tetris table.
 
         :param rows: Number of rows on the board.
         :param cols: Number of columns on the board.
+        :param shape_generator: The source of the spawned shapes, an unseeded PieceGenerator if None.
         """
         self.rows = rows
         self.cols = cols
         self.board = np.zeros((rows, cols), dtype=int)
         self.current_shape = None
         self.current_shape_name = None
+        self.current_orientation = None
         self.shape_position = (0, 0)  # (row, col)
-        self.shape_generator = list(Definitions.SHAPES.keys())
-        # self.shape_generator = list('I'*7)
-        np.random.shuffle(self.shape_generator)
-        self.shape_generator_pos = 0
+        self.shape_generator = shape_generator if shape_generator is not None else PieceGenerator()
         self._shape_landed = False
         self._rows_cleared = 0
         self.game_over = False
         self.shape_orientation = 0
         self.holes_before = 0
+        self._recompute_column_statistics()
 
     def spawn_next_shape(self):
         """
         Spawn the next shape on the board.
         """
-        if self.shape_generator_pos >= len(self.shape_generator):
-            np.random.shuffle(self.shape_generator)
-            self.shape_generator_pos = 0
-
-        self.current_shape_name = self.shape_generator[self.shape_generator_pos]
-        self.current_shape = Definitions.SHAPES[self.current_shape_name]
-        self.shape_generator_pos += 1
+        self.current_shape_name = self.shape_generator.next()
+        self.current_orientation = ORIENTATIONS[self.current_shape_name][0]
+        self.current_shape = self.current_orientation.matrix
         self.shape_position = (0, self.cols // 2 - len(self.current_shape) // 2)
         self.shape_orientation = 0
         self._shape_landed = False
-        self.game_over = not self.can_move(self.current_shape, self.shape_position)
+        self.game_over = not self.can_place(self.current_orientation, self.shape_position)
 
     def rotate(self) -> bool:
         """
@@ -52,10 +50,9 @@ class Table:
         :return: True if rotate operation was successful, False if not
         """
         if self.current_shape is not None:
-            rotated_shape = np.rot90(self.current_shape)
-            self.shape_orientation = (self.shape_orientation + 90) % 360
-            if self.can_move(rotated_shape, self.shape_position):
-                self.current_shape = rotated_shape
+            rotated = ORIENTATIONS[self.current_shape_name][(self.current_orientation.index + 1) % 4]
+            if self.can_place(rotated, self.shape_position):
+                self._set_orientation(rotated)
                 return True
             else:
                 return False
@@ -68,7 +65,7 @@ class Table:
         """
         if self.current_shape is not None:
             new_position = (self.shape_position[0], self.shape_position[1] + 1)
-            if self.can_move(self.current_shape, new_position):
+            if self.can_place(self.current_orientation, new_position):
                 self.shape_position = new_position
                 return True
             else:
@@ -82,7 +79,7 @@ class Table:
         """
         if self.current_shape is not None:
             new_position = (self.shape_position[0], self.shape_position[1] - 1)
-            if self.can_move(self.current_shape, new_position):
+            if self.can_place(self.current_orientation, new_position):
                 self.shape_position = new_position
                 return True
             else:
@@ -96,12 +93,72 @@ class Table:
         """
         if self.current_shape is not None:
             new_position = (self.shape_position[0] + 1, self.shape_position[1])
-            if self.can_move(self.current_shape, new_position):
+            if self.can_place(self.current_orientation, new_position):
                 self.shape_position = new_position
             else:
                 self.place_shape()
         return True
 
+    def hard_drop(self) -> bool:
+        """
+        Drop the current shape straight to its resting row and place it.
+
+        :return: True if hard drop operation was successful, False if not
+        """
+        if self.current_shape is not None:
+            row, col = self.shape_position
+            self.shape_position = (self.landing_row(self.current_orientation, col, row), col)
+            self.place_shape()
+        return True
+
+    def commit_placement(self, new_position, new_shape_orientation) -> bool:
+        """
+        Place the current shape directly at its final resting position and orientation, instead of
+        moving it there step by step. Full rows are cleared like with any other placement.
+
+        :param new_position: (row, col) at which the shape should be placed.
+        :param new_shape_orientation: An integer (0, 90, 180, 270) denoting the target orientation.
+        :return: True if the shape fits and rests at the position and was placed, False if not.
+        """
+        if self.current_shape is None:
+            return False
+
+        orientation = ORIENTATIONS[self.current_shape_name][(new_shape_orientation // 90) % 4]
+        row, col = new_position
+        if not self.can_place(orientation, new_position) or self.can_place(orientation, (row + 1, col)):
+            return False
+
+        self._set_orientation(orientation)
+        self.shape_position = new_position
+        self.place_shape()
+        return True
+
+    def landing_row(self, orientation: Orientation, col, start_row=0) -> int:
+        """
+        Find the row a shape comes to rest on when dropped straight down from a valid position.
+        When the shape starts above the surface of every column it covers, the row is calculated
+        from the column heights and the shape bottom profile, otherwise it is dropped step by step.
+
+        :param orientation: The shape orientation.
+        :param col: The column of the top-left corner.
+        :param start_row: The row of the top-left corner the shape is dropped from.
+        :return: The landing row of the top-left corner.
+        """
+        row = self.rows
+        board_col = col + orientation.left
+        for bottom in orientation.bottom_profile:
+            row = min(row, self.rows - self.column_heights[board_col] - 1 - bottom)
+            board_col += 1
+
+        if row >= start_row:
+            return row
+
+        # The shape starts below the surface (under an overhang), so drop it step by step
+        row = start_row
+        while self.can_place(orientation, (row + 1, col)):
+            row += 1
+        return row
+
     def shape_reposition(self, new_position, new_shape_orientation, reset_shape_landed = False) -> bool:
         """
         Move the current shape to the specified position and orientation.
@@ -117,34 +174,27 @@ class Table:
         if self.current_shape is None:
             return False
         else:
-            # Calculate how many rotations we need
-            offset_degrees = (new_shape_orientation - self.shape_orientation) % 360
-            rotations_needed = offset_degrees // 90
-
-            # Save old shape, orientation and position to revert if necessary
-            old_shape = self.current_shape.copy()
-            old_orientation = self.shape_orientation
-            old_position = self.shape_position
-
-            # Perform the required number of rotations, storing the result each time
-            rotated_shape = self.current_shape
-            for _ in range(rotations_needed):
-                rotated_shape = np.rot90(rotated_shape)
-
-            # Check if we can place the newly rotated shape at new_position
-            is_valid = self.can_move(rotated_shape, new_position)
+            # Look up the target orientation, the current one is kept if placement is invalid
+            rotated = ORIENTATIONS[self.current_shape_name][(new_shape_orientation // 90) % 4]
+
+            # Check if we can place the rotated shape at new_position
+            is_valid = self.can_place(rotated, new_position)
             if is_valid:
-                self.current_shape = rotated_shape
+                self._set_orientation(rotated)
                 self.shape_position = new_position
-                self.shape_orientation = new_shape_orientation
-            else:
-                # If placement is invalid, revert
-                self.current_shape = old_shape
-                self.shape_position = old_position
-                self.shape_orientation = old_orientation
 
             return is_valid
 
+    def _set_orientation(self, orientation: Orientation):
+        """
+        Set the orientation of the current shape.
+
+        :param orientation: The precomputed orientation of the current shape.
+        """
+        self.current_orientation = orientation
+        self.current_shape = orientation.matrix
+        self.shape_orientation = orientation.degrees
+
     def can_move(self, shape, position) -> bool:
         """
         Check if a shape can be moved to a specific position.
@@ -168,33 +218,168 @@ class Table:
                         return False
         return True
 
+    def can_place(self, orientation: Orientation, position) -> bool:
+        """
+        Check if a precomputed shape orientation can be placed at a specific position.
+
+        :param orientation: The shape orientation to place.
+        :param position: A tuple (row, col) of the top-left corner.
+        :return: True if the orientation can be placed, False otherwise.
+        """
+        row, col = position
+        if (row + orientation.top < 0 or row + orientation.bottom >= self.rows or
+                col + orientation.left < 0 or col + orientation.right >= self.cols):
+            return False
+
+        board = self.board
+        for r, c in orientation.cells:
+            if board[row + r, col + c]:
+                return False
+        return True
+
     def place_shape(self):
         """
         Place the current shape on the board and clear full rows.
         """
         row, col = self.shape_position
+        orientation = self.current_orientation
         self.holes_before = self.get_holes()
 
-        for r in range(self.current_shape.shape[0]):
-            for c in range(self.current_shape.shape[1]):
-                if self.current_shape[r, c]:
-                        self.board[row + r, col + c] = 1 if self.current_shape_name == 'I' else self.current_shape[1, 1]
+        color = SHAPE_COLORS[self.current_shape_name]
+        for r, c in orientation.cells:
+            self.board[row + r, col + c] = color
+        self._add_cells_to_columns(orientation, self.shape_position)
 
         self.current_shape = None
         self.current_shape_name = None
+        self.current_orientation = None
         self._shape_landed = True
-        self._clear_rows()
+        self._clear_rows(range(row + orientation.top, row + orientation.bottom + 1))
 
-    def _clear_rows(self):
+    def _clear_rows(self, candidate_rows=None):
         """
         Clear full rows on the board.
+
+        :param candidate_rows: The rows that may have been filled, all rows are checked if not given.
         """
-        full_rows = [r for r in range(self.rows) if all(self.board[r])]
+        if candidate_rows is None:
+            candidate_rows = range(self.rows)
+
+        full_rows = [r for r in candidate_rows if self.board[r].all()]
         for row in full_rows:
             self._rows_cleared += 1
             self.board[1:row + 1] = self.board[:row]
             self.board[0] = 0
 
+        if full_rows:
+            self._remove_rows_from_columns(full_rows)
+
+    def _cell_filled(self, row, col) -> bool:
+        """
+        Check if a board cell is occupied.
+
+        :param row: The cell row.
+        :param col: The cell column.
+        :return: True if the cell is occupied, False otherwise.
+        """
+        return self.board[row, col] != 0
+
+    def _recompute_column_statistics(self):
+        """
+        Recompute the column heights and hole counts from the whole board.
+        """
+        filled = self.board != 0
+        heights = np.where(filled.any(axis=0), self.rows - filled.argmax(axis=0), 0)
+        self.column_heights = [int(height) for height in heights]
+        self._column_filled = [int(count) for count in filled.sum(axis=0)]
+        self.column_holes = [height - count for height, count in zip(self.column_heights, self._column_filled)]
+
+    def _add_cells_to_columns(self, orientation: Orientation, position):
+        """
+        Update the column heights and hole counts of the columns covered by a placed shape.
+
+        :param orientation: The placed shape orientation.
+        :param position: A tuple (row, col) of the top-left corner.
+        """
+        row, col = position
+        heights = self.column_heights
+        filled = self._column_filled
+        for r, c in orientation.cells:
+            board_col = col + c
+            filled[board_col] += 1
+            height = self.rows - row - r
+            if height > heights[board_col]:
+                heights[board_col] = height
+
+        for board_col in range(col + orientation.left, col + orientation.right + 1):
+            self.column_holes[board_col] = heights[board_col] - filled[board_col]
+
+    def _remove_rows_from_columns(self, full_rows):
+        """
+        Update the column heights and hole counts after full rows were cleared.
+        A column drops by the number of cleared rows, unless its top cell was cleared, in which case
+        its new top is searched below the cleared rows.
+
+        :param full_rows: The indices of the cleared rows, before they were removed.
+        """
+        cleared = len(full_rows)
+        for col in range(self.cols):
+            self._column_filled[col] -= cleared
+            top = self.rows - self.column_heights[col]
+            if top in full_rows:
+                row = top + cleared
+                while row < self.rows and not self._cell_filled(row, col):
+                    row += 1
+                self.column_heights[col] = self.rows - row
+            else:
+                self.column_heights[col] -= cleared
+            self.column_holes[col] = self.column_heights[col] - self._column_filled[col]
+
+    def snapshot(self) -> tuple:
+        """
+        Save the part of the table state that moving or placing the current shape can change.
+        The shape generator is not saved, so spawning a new shape can not be undone.
+
+        :return: A token to pass to restore.
+        """
+        return (self._save_board(), self.column_heights.copy(), self._column_filled.copy(),
+                self.column_holes.copy(), self._rows_cleared, self.holes_before, self.current_shape_name,
+                self.current_orientation, self.shape_position, self._shape_landed, self.game_over)
+
+    def restore(self, token: tuple):
+        """
+        Restore the table to a state saved by snapshot. The same token can be restored many times.
+
+        :param token: A token returned by snapshot.
+        """
+        (board, heights, filled, holes, self._rows_cleared, self.holes_before, self.current_shape_name,
+         orientation, self.shape_position, self._shape_landed, self.game_over) = token
+        self._load_board(board)
+        self.column_heights[:] = heights
+        self._column_filled[:] = filled
+        self.column_holes[:] = holes
+        if orientation is None:
+            self.current_orientation = None
+            self.current_shape = None
+        else:
+            self._set_orientation(orientation)
+
+    def _save_board(self) -> np.ndarray:
+        """
+        Copy the board for a snapshot.
+
+        :return: A copy of the board cells.
+        """
+        return self.board.copy()
+
+    def _load_board(self, board: np.ndarray):
+        """
+        Copy board cells saved by _save_board back into the board.
+
+        :param board: The saved board cells.
+        """
+        self.board[:] = board
+
     def board_copy(self) -> np.ndarray:
         """
         Get current board copy.
@@ -204,10 +389,9 @@ class Table:
         temp_board = self.board.copy()
         if self.current_shape is not None:
             row, col = self.shape_position
-            for r in range(self.current_shape.shape[0]):
-                for c in range(self.current_shape.shape[1]):
-                    if self.current_shape[r, c]:
-                        self.board[row + r, col + c] = 1 if self.current_shape_name == 'I' else self.current_shape[1, 1]
+            color = SHAPE_COLORS[self.current_shape_name]
+            for r, c in self.current_orientation.cells:
+                temp_board[row + r, col + c] = color
 
         return temp_board
 
@@ -229,6 +413,14 @@ class Table:
         self._rows_cleared = 0
         return temp
 
+    def get_column_heights(self) -> list[int]:
+        """
+        Get the height of every column.
+
+        :return: A list of column heights.
+        """
+        return self.column_heights
+
     def get_bumpiness(self) -> int:
         """
         Calculate the bumpiness of the board.
@@ -236,20 +428,8 @@ class Table:
 
         :return: Total bumpiness
         """
-        column_heights = []
-        for col in range(self.cols):
-            for row in range(len(self.board)):
-                if self.board[row][col] != 0:
-                    column_heights.append(self.rows - row)
-                    break
-            else:
-                column_heights.append(0)
-
-        bumpiness = 0
-        for i in range(len(column_heights) - 1):
-            bumpiness += abs(column_heights[i] - column_heights[i + 1])
-
-        return bumpiness
+        heights = self.column_heights
+        return sum(abs(heights[i] - heights[i + 1]) for i in range(self.cols - 1))
 
     def get_max_height(self) -> int:
         """
@@ -257,16 +437,7 @@ class Table:
 
         :return: Maximum column height.
         """
-        max_height = 0
-
-        for col in range(self.cols):
-            for row in range(self.rows):
-                if self.board[row][col] != 0 and max_height < self.rows - row:
-                    max_height = self.rows - row
-                    break
-
-        return max_height
-
+        return max(self.column_heights)
 
     def get_holes(self) -> int:
         """
@@ -274,15 +445,7 @@ class Table:
 
         :return: Total number of holes (empty cells beneath at least one filled cell).
         """
-        holes = 0
-        for col in range(self.cols):
-            found_block = False
-            for row in range(self.rows):
-                if self.board[row, col] != 0 and not found_block:
-                    found_block = True
-                elif self.board[row, col] == 0 and found_block:
-                    holes += 1
-        return holes
+        return sum(self.column_holes)
 
     def get_statistics(self) -> dict:
         """
@@ -0,0 +1,225 @@
+import time
+
+import numpy as np
+
+from AIPlayer import BatchEvaluator
+from Gameplay import Definitions
+from Gameplay.PieceGenerator import PieceGenerator
+from Gameplay.ShapeOrientations import ORIENTATIONS
+
+# Index of every shape in the candidate tables
+SHAPE_NAMES = list(Definitions.SHAPES.keys())
+
+
+class VectorizedTetris:
+    """
+    The VectorizedTetris class plays many headless column scan games in lockstep, with all the boards in one array.
+    """
+
+    def __init__(self, weights, seeds, rows=Definitions.BOARD_HEIGHT, cols=Definitions.BOARD_WIDTH,
+                 max_placements=float('inf')):
+        """
+        Initialize the games.
+
+        :param weights: The heuristic weights of every game, shape (games, 4).
+        :param seeds: The shape sequence seed of every game, None entries get a fresh random seed.
+        :param rows: Number of rows on every board.
+        :param cols: Number of columns on every board.
+        :param max_placements: The maximum number of shapes to place in every game, like run_tetris_game.
+        """
+        self.weights = np.asarray(weights, dtype=float).reshape(-1, 4)
+        self.n_games = len(self.weights)
+        self.rows = rows
+        self.cols = cols
+        self.shape_generators = [PieceGenerator(seed) for seed in seeds]
+        if len(self.shape_generators) != self.n_games:
+            raise ValueError("Expected one seed per game.")
+
+        self.boards = np.zeros((self.n_games, rows, cols), dtype=bool)
+        self.scores = np.zeros(self.n_games, dtype=np.int64)
+        self.lines = np.zeros(self.n_games, dtype=np.int64)
+        self.placements = np.zeros(self.n_games, dtype=np.int64)
+        self.max_placements = max_placements
+        self.stopped_by = np.full(self.n_games, None, dtype=object)
+        self.active = np.ones(self.n_games, dtype=bool)
+        self.shapes = np.zeros(self.n_games, dtype=np.int64)
+
+        self._build_candidate_tables()
+        self._spawn_next_shapes(np.arange(self.n_games))
+
+    def _build_candidate_tables(self):
+        """
+        Build the column scan candidates of every orientation of every shape, padded to one slot per column.
+        """
+        shape_count = len(SHAPE_NAMES)
+        self.candidate_cells = np.zeros((shape_count, 4, self.cols, 4, 2), dtype=np.int64)
+        self.candidate_cols = np.zeros((shape_count, 4, self.cols), dtype=np.int64)
+        self.candidate_mask = np.zeros((shape_count, 4, self.cols), dtype=bool)
+        self.spawn_cells = np.zeros((shape_count, 4, 4, 2), dtype=np.int64)
+
+        for shape, name in enumerate(SHAPE_NAMES):
+            spawn_col = self.cols // 2 - len(Definitions.SHAPES[name]) // 2
+            for orientation in ORIENTATIONS[name]:
+                cols = range(-orientation.left, self.cols - orientation.left - orientation.width + 1)
+                # Padding slots repeat the last column and are masked out
+                for slot in range(self.cols):
+                    self.candidate_cells[shape, orientation.index, slot] = orientation.cells
+                    self.candidate_cols[shape, orientation.index, slot] = cols[min(slot, len(cols) - 1)]
+                self.candidate_mask[shape, orientation.index, :len(cols)] = True
+
+                # Cells of the orientation at the spawn position of Table.spawn_next_shape
+                self.spawn_cells[shape, orientation.index] = [(r, c + spawn_col) for r, c in orientation.cells]
+
+        # Column scan tries 4 rotations of every shape, except the 'O' shape
+        self.rotation_mask = np.array([[True] * 4 if name != 'O' else [True, False, False, False]
+                                       for name in SHAPE_NAMES])
+
+    def _spawn_next_shapes(self, games: np.ndarray):
+        """
+        Spawn the next shape of some games, and end the games whose shape does not fit at the spawn position.
+
+        :param games: Indices of the games.
+        """
+        self.shapes[games] = [SHAPE_NAMES.index(self.shape_generators[game].next()) for game in games]
+        self.active[games[~self._spawn_fits(games)[:, 0]]] = False
+
+    def _spawn_fits(self, games: np.ndarray) -> np.ndarray:
+        """
+        Check which orientations of the current shape of some games fit at the spawn position.
+
+        :param games: Indices of the games.
+        :return: A boolean array of shape (games, 4).
+        """
+        cells = self.spawn_cells[self.shapes[games]]
+        return ~self.boards[games[:, None, None], cells[:, :, :, 0], cells[:, :, :, 1]].any(axis=2)
+
+    def _rotated_orientations(self, games: np.ndarray) -> np.ndarray:
+        """
+        Find the orientation column scan reaches after 0-3 rotate actions at the spawn position,
+        where a blocked rotation keeps the previous orientation.
+
+        :param games: Indices of the games.
+        :return: The orientation index reached by every number of rotations, shape (games, 4).
+        """
+        fits = self._spawn_fits(games)
+        reached = np.zeros((len(games), 4), dtype=np.int64)
+        for rotation in range(1, 4):
+            rotated = (reached[:, rotation - 1] + 1) % 4
+            reached[:, rotation] = np.where(fits[np.arange(len(games)), rotated], rotated, reached[:, rotation - 1])
+        return reached
+
+    def evaluate_candidates(self, games: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Build and evaluate every candidate placement of the current shape of some games.
+
+        :param games: Indices of the games.
+        :return: A tuple containing:
+            - boards (np.ndarray): The board after every candidate, shape (games, candidates, rows, cols).
+            - cleared (np.ndarray): The rows every candidate clears, shape (games, candidates).
+            - features (np.ndarray): The heuristic statistics of every candidate, shape (games, candidates, 4).
+            - valid (np.ndarray): Which candidates fit on the board, shape (games, candidates).
+        """
+        boards = self.boards[games]
+        shapes = self.shapes[games][:, None]
+        orientations = self._rotated_orientations(games)
+
+        # Candidates are ordered like column scan, rotation after rotation and column after column
+        n, count = len(games), 4 * self.cols
+        cells = self.candidate_cells[shapes, orientations].reshape(n, count, 4, 2)
+        cols = self.candidate_cols[shapes, orientations].reshape(n, count)
+        mask = (self.candidate_mask[shapes, orientations] & self.rotation_mask[shapes[:, 0]][:, :, None]).reshape(n, count)
+        landing = BatchEvaluator.stacked_landing_rows(boards, cells, cols)
+        valid = mask & (landing >= 0)
+
+        # Stamp every candidate on its own copy of its game board
+        candidate_boards = np.repeat(boards[:, None], count, axis=1)
+        cell_rows = np.clip(landing[:, :, None] + cells[:, :, :, 0], 0, self.rows - 1)
+        cell_cols = cols[:, :, None] + cells[:, :, :, 1]
+        candidate_boards[np.arange(n)[:, None, None], np.arange(count)[None, :, None], cell_rows, cell_cols] = True
+
+        flat_boards, cleared = BatchEvaluator.clear_full_rows(candidate_boards.reshape(n * count, self.rows, self.cols))
+        features = np.column_stack([BatchEvaluator.board_features(flat_boards), BatchEvaluator.CLEARED_REWARD[cleared]])
+        return (flat_boards.reshape(n, count, self.rows, self.cols), cleared.reshape(n, count),
+                features.reshape(n, count, 4), valid)
+
+    def step(self):
+        """
+        Place one shape in every active game.
+        """
+        games = np.flatnonzero(self.active)
+        if len(games) == 0:
+            return
+
+        # Games in the same state (board and shape) share their candidates, as GA games on common seeds often do
+        keys = np.concatenate([np.packbits(self.boards[games].reshape(len(games), -1), axis=1),
+                               self.shapes[games, None].astype(np.uint8)], axis=1)
+        keys = np.ascontiguousarray(keys).view(np.dtype((np.void, keys.shape[1]))).reshape(-1)
+        _, first, states = np.unique(keys, return_index=True, return_inverse=True)
+
+        boards, cleared, features, valid = self.evaluate_candidates(games[first])
+        valid = valid[states]
+        best = BatchEvaluator.best_candidates(features, self.weights[games], states, valid)
+
+        # Games without any valid candidate are over
+        placed = valid.any(axis=1)
+        self.active[games[~placed]] = False
+        games, best = games[placed], best[placed]
+        placed_rows = states[placed]
+
+        # Lock the best candidate of every game
+        self.boards[games] = boards[placed_rows, best]
+        lines = cleared[placed_rows, best]
+        self.lines[games] += lines
+        self.scores[games] += np.asarray(Definitions.POINTS_PER_LINE)[lines]
+        self.placements[games] += 1
+
+        self._spawn_next_shapes(games)
+        capped = games[(self.placements[games] >= self.max_placements) & self.active[games]]
+        self.stopped_by[capped] = 'placements'
+        self.active[capped] = False
+
+    def run(self, max_seconds=float('inf')) -> np.ndarray:
+        """
+        Play until every game is over.
+
+        :param max_seconds: The maximum number of seconds the games may take together (optional).
+        :return: The final score of every game.
+        """
+        start_time = time.perf_counter()
+        while self.active.any():
+            self.step()
+            if time.perf_counter() - start_time >= max_seconds:
+                self.stopped_by[self.active] = 'seconds'
+                self.active[:] = False
+        return self.scores
+
+
+def play_tetris_games(weights, seeds, max_placements=float('inf'), max_seconds=float('inf')) -> list[dict]:
+    """
+    Play many Tetris games with AI only, all in lockstep, with column scan placements, like play_tetris_game.
+
+    :param weights: The heuristic weights of every game, shape (games, 4).
+    :param seeds: The shape sequence seed of every game.
+    :param max_placements: The maximum number of shapes to place in every game (optional).
+    :param max_seconds: The maximum number of seconds the games may take together (optional).
+    :return: A dictionary for every game with the final score, the number of lines cleared, the number of shapes
+             placed, whether a budget ended the game before it was lost and which one.
+    """
+    games = VectorizedTetris(weights, seeds, max_placements=max_placements)
+    games.run(max_seconds)
+    return [{'score': int(score), 'lines': int(lines), 'placements': int(placements),
+             'truncated': stopped_by is not None, 'stopped_by': stopped_by}
+            for score, lines, placements, stopped_by in zip(games.scores, games.lines, games.placements,
+                                                            games.stopped_by)]
+
+
+def run_tetris_games(weights, seeds, max_placements=float('inf')) -> np.ndarray:
+    """
+    Run many Tetris games with AI only, all in lockstep, with column scan placements.
+
+    :param weights: The heuristic weights of every game, shape (games, 4).
+    :param seeds: The shape sequence seed of every game.
+    :param max_placements: The maximum number of shapes to place in every game (optional).
+    :return: The final score of every game.
+    """
+    return VectorizedTetris(weights, seeds, max_placements=max_placements).run()
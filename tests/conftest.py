@@ -0,0 +1,40 @@
+import builtins
+import os
+import sys
+
+import pytest
+
+# The repository root holds the AIPlayer, GA and Gameplay packages, and the GA script imports its siblings directly
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (ROOT, os.path.join(ROOT, 'GA')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+@pytest.fixture(autouse=True)
+def quiet_games(monkeypatch):
+    """
+    Silence the score every headless game prints.
+    """
+    monkeypatch.setattr(builtins, 'print', lambda *args, **kwargs: None)
+
+
+@pytest.fixture
+def short_games(monkeypatch):
+    """
+    Import the GA script with evaluators that play one short game per individual.
+    """
+    pytest.importorskip('eckity')
+    import TetrisGeneticAlgorithm as tga
+
+    class ShortPopulationEvaluator(tga.PopulationEvaluator):
+        def __init__(self, **kwargs):
+            super().__init__(rounds=1, max_placements=30, **kwargs)
+
+    class ShortSteadyStateEvolution(tga.SteadyStateEvolution):
+        def __init__(self, **kwargs):
+            super().__init__(rounds=1, max_placements=30, **kwargs)
+
+    monkeypatch.setattr(tga, 'PopulationEvaluator', ShortPopulationEvaluator)
+    monkeypatch.setattr(tga, 'SteadyStateEvolution', ShortSteadyStateEvolution)
+    return tga
@@ -0,0 +1,56 @@
+from AIPlayer.AIBrain import AIBrain
+from Gameplay import Definitions
+from Gameplay.PieceGenerator import PieceGenerator
+from Gameplay.Table import Table
+
+WEIGHTS = [-0.3, -0.2, -0.9, 0.2]
+
+
+def stacked_table(height) -> Table:
+    """
+    Stack shapes at the first column scan candidate until the board reaches a height.
+    """
+    table = Table(Definitions.BOARD_HEIGHT, Definitions.BOARD_WIDTH, PieceGenerator(3))
+    table.spawn_next_shape()
+    while table.get_max_height() < height:
+        brain = AIBrain(table, [0.0, 0.0, 0.0, 0.0])
+        brain.find_best_placement_column_scan()
+        assert table.commit_placement(*brain.best_placement)
+        table.check_for_cleared_rows()
+        table.spawn_next_shape()
+    return table
+
+
+def test_bfs_gives_up_when_its_time_budget_runs_out():
+    table = Table(Definitions.BOARD_HEIGHT, Definitions.BOARD_WIDTH, PieceGenerator(1))
+    table.spawn_next_shape()
+    brain = AIBrain(table, WEIGHTS)
+    assert brain.find_best_placement_bfs(time_budget=0) == (float('-inf'), [])
+    assert brain.best_placement is None
+    brain.find_best_placement_bfs()
+    assert brain.best_placement is not None
+
+
+def test_anytime_keeps_column_scan_without_a_complete_lookahead_ply(monkeypatch):
+    table = stacked_table(Definitions.ANYTIME_LOOKAHEAD_HEIGHTS[0])
+    column_scan = AIBrain(table, WEIGHTS)
+    expected = column_scan.find_best_placement_column_scan()
+
+    def unfinished_lookahead(brain, preview, time_budget):
+        # Out of time before its first ply, with a placement column scan would not choose
+        brain.best_placement, brain.completed_plies = ((0, 0), 0), 0
+        return float('inf'), ['drop']
+
+    monkeypatch.setattr(AIBrain, 'find_best_placement_lookahead', unfinished_lookahead)
+    brain = AIBrain(table, WEIGHTS)
+    assert brain.find_best_placement_anytime(deadline=1000) == expected
+    assert brain.best_placement == column_scan.best_placement
+
+
+def test_lookahead_counts_the_plies_it_completes():
+    table = stacked_table(Definitions.ANYTIME_LOOKAHEAD_HEIGHTS[0])
+    brain = AIBrain(table, WEIGHTS)
+    brain.find_best_placement_lookahead(2, time_budget=None)
+    assert brain.completed_plies == 2
+    brain.find_best_placement_lookahead(2, time_budget=0)
+    assert brain.completed_plies == 0
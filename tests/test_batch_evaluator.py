@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from AIPlayer import BatchEvaluator
+from AIPlayer.AIBrain import AIBrain
+from Gameplay import Definitions
+from Gameplay.PieceGenerator import PieceGenerator
+from Gameplay.Table import Table
+
+WEIGHTS = [-0.3, -0.2, -0.9, 0.2]
+
+
+def seeded_placements(seed, weights, placements):
+    """
+    Play a seeded game with column scan, and yield the table and the column scan result before every placement.
+    """
+    table = Table(Definitions.BOARD_HEIGHT, Definitions.BOARD_WIDTH, PieceGenerator(seed))
+    table.spawn_next_shape()
+    for _ in range(placements):
+        brain = AIBrain(table, weights)
+        score, _ = brain.find_best_placement_column_scan()
+        placement = brain.best_placement
+        if placement is None:
+            return
+        yield table, score, (tuple(placement[0]), placement[1])
+
+        assert table.commit_placement(*placement)
+        table.check_for_cleared_rows()
+        table.spawn_next_shape()
+        if table.game_over:
+            return
+
+
+@pytest.mark.parametrize('seed', [1, 2])
+def test_batch_makes_the_column_scan_decisions(seed):
+    # Seed 2 has exact ties that a matrix product used to round differently
+    steps = 0
+    for table, score, placement in seeded_placements(seed, WEIGHTS, 1500):
+        brain = AIBrain(table, WEIGHTS)
+        batch_score, _ = brain.find_best_placement_batch()
+        assert (tuple(brain.best_placement[0]), brain.best_placement[1]) == placement
+        assert batch_score == score
+        steps += 1
+    assert steps > 300
+
+
+def test_bfs_never_scores_below_column_scan():
+    for table, score, _ in seeded_placements(2, WEIGHTS, 300):
+        bfs_score, _ = AIBrain(table, WEIGHTS).find_best_placement_bfs()
+        assert bfs_score >= score
+
+
+def test_population_product_breaks_ties_like_column_scan():
+    rng = np.random.default_rng(0)
+    features = rng.integers(0, 40, size=(5, 40, 4)).astype(float)
+    # Repeated candidates tie exactly, the first one must win
+    features[:, 20:] = features[:, :20]
+    weights = rng.choice([-0.9, -0.7, -0.3, -0.1, 0.1, 0.2], size=(30, 4))
+    states = rng.integers(0, 5, size=30)
+    valid = rng.random((30, 40)) < 0.8
+
+    expected = np.where(valid, BatchEvaluator.weighted_scores(features[states], weights[:, None, :]), -np.inf)
+    best = BatchEvaluator.best_candidates(features, weights, states, valid)
+    assert (best == expected.argmax(axis=1)).all()
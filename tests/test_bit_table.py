@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from AIPlayer.AIAgent import AIAgent
+from Gameplay import Definitions
+from Gameplay.BitTable import BitTable
+from Gameplay.PieceGenerator import PieceGenerator
+from Gameplay.Table import Table
+
+WEIGHTS = [-0.3, -0.2, -0.9, 0.2]
+
+
+def new_table(table_type, seed) -> Table:
+    """
+    Build a table of some engine with its first shape spawned.
+    """
+    table = table_type(Definitions.BOARD_HEIGHT, Definitions.BOARD_WIDTH, PieceGenerator(seed))
+    table.spawn_next_shape()
+    return table
+
+
+def assert_same_state(table, bit_table):
+    """
+    Check that two tables of different engines hold the same board, colors included, and column statistics.
+    """
+    np.testing.assert_array_equal(bit_table.board, table.board)
+    np.testing.assert_array_equal(bit_table.board_copy(), table.board_copy())
+    assert bit_table.get_statistics() == table.get_statistics()
+    assert bit_table.get_column_heights() == table.get_column_heights()
+
+
+def test_bit_table_plays_like_table():
+    table, bit_table = new_table(Table, 2), new_table(BitTable, 2)
+    agent = AIAgent(*WEIGHTS)
+    for _ in range(400):
+        placement = agent.choose_placement(table)
+        assert agent.choose_placement(bit_table) == placement
+        if placement is None:
+            break
+        assert table.commit_placement(*placement) and bit_table.commit_placement(*placement)
+        assert bit_table.check_for_cleared_rows() == table.check_for_cleared_rows()
+        assert_same_state(table, bit_table)
+        table.spawn_next_shape()
+        bit_table.spawn_next_shape()
+        assert bit_table.game_over == table.game_over
+        if table.game_over:
+            break
+
+
+def test_snapshot_restore_round_trip():
+    for table_type in (Table, BitTable):
+        table = new_table(table_type, 5)
+        agent = AIAgent(*WEIGHTS)
+        for _ in range(30):
+            assert table.commit_placement(*agent.choose_placement(table))
+            table.check_for_cleared_rows()
+            table.spawn_next_shape()
+
+        board, statistics, shape = table.board.copy(), table.get_statistics(), table.current_shape_name
+        token = table.snapshot()
+        for _ in range(2):
+            table.hard_drop()
+            assert table.current_shape_name is None
+            table.restore(token)
+            np.testing.assert_array_equal(table.board, board)
+            assert table.get_statistics() == statistics
+            assert table.current_shape_name == shape
+
+
+def test_bit_table_loads_a_colored_board():
+    board = np.zeros((Definitions.BOARD_HEIGHT, Definitions.BOARD_WIDTH), dtype=int)
+    board[-1, :-1] = 3
+    board[-2, 2] = 7
+    table, bit_table = Table(), BitTable()
+    table.board = board.copy()
+    table._recompute_column_statistics()
+    bit_table.board = board
+    np.testing.assert_array_equal(bit_table.board, board)
+    assert bit_table.get_statistics() == table.get_statistics()
+
+
+def test_bit_table_board_is_read_only():
+    bit_table = new_table(BitTable, 1)
+    with pytest.raises(ValueError):
+        bit_table.board[-1, 0] = 1
+    assert not bit_table.board.any()
@@ -0,0 +1,31 @@
+from importlib.metadata import version
+
+import pytest
+
+pytest.importorskip('eckity')
+
+from Checkpoint import load_checkpoint
+
+# The generational GA and ResumableEvolution use the selection and evolution API of eckity 0.3, the version
+# README pins
+pytestmark = pytest.mark.skipif(not version('eckity').startswith('0.3.'),
+                                reason="The generational GA requires eckity 0.3, see README.")
+
+
+def population_state(path) -> tuple:
+    """
+    Get the generation, weights and fitness of the population saved in a checkpoint.
+    """
+    checkpoint = load_checkpoint(path)
+    return checkpoint['generation'], [(state['weights'], state['fitness']) for state in checkpoint['population']]
+
+
+def test_resumed_run_equals_an_uninterrupted_run(short_games, tmp_path):
+    full, part = str(tmp_path / 'full.pkl.gz'), str(tmp_path / 'part.pkl.gz')
+    short_games.TetrisGeneticAlgorithm(6, 4, processes=2, random_seed=7, checkpoint_path=full).run()
+    short_games.TetrisGeneticAlgorithm(6, 2, processes=2, random_seed=7, checkpoint_path=part).run()
+    assert population_state(part)[0] == 1
+
+    resumed = short_games.TetrisGeneticAlgorithm(6, 4, processes=2, checkpoint_path=part, resume=True)
+    resumed.run()
+    assert population_state(part) == population_state(full)
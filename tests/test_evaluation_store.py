@@ -0,0 +1,28 @@
+from GA.EvaluationStore import EvaluationStore
+
+WEIGHTS = [-0.3, -0.2, -0.9, 0.2]
+
+
+def test_store_round_trip(tmp_path):
+    path = str(tmp_path / 'games.sqlite3')
+    game = (1200, 2.5, 'placements', 500, 30)
+    with EvaluationStore(path) as store:
+        assert store.get(WEIGHTS, 7, 500) is None
+        store.put(WEIGHTS, 7, game, 500)
+        store.put(WEIGHTS, 8, (60, 0.1, None, 40, 1), 500)
+        store.put(WEIGHTS, 9, (900, 120.0, 'seconds', 300, 20), 500)
+
+    # Another run reads the games back from the file, except the one stopped by the time budget
+    with EvaluationStore(path) as store:
+        assert store.get(WEIGHTS, 7, 500) == game
+        assert store.get(WEIGHTS, 8, 500) == (60, 0.1, None, 40, 1)
+        assert store.get(WEIGHTS, 9, 500) is None
+        assert store.get(WEIGHTS, 7) is None
+        assert len(store) == 2
+        assert store.best_weights(max_placements=500) == [
+            {'weights': WEIGHTS, 'games': 2, 'score': 630.0, 'lines': 15.5, 'placements': 270.0}
+        ]
+        assert store.get_statistics()['hits'] == 2
+
+    with EvaluationStore(path, search_method='bfs') as store:
+        assert store.get(WEIGHTS, 7, 500) is None
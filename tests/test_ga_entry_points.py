@@ -0,0 +1,15 @@
+import pytest
+
+
+@pytest.mark.parametrize('options', [{'cma': True}, {'cma': True, 'table_engine': 'bit'}, {'steady_state': True}])
+def test_optimizers_run_from_the_ga(short_games, options):
+    ga = short_games.TetrisGeneticAlgorithm(population_size=4, generations=2, processes=2, random_seed=1, **options)
+    ga.run()
+    assert len(ga.best_individual.weights) == 4
+
+
+def test_one_optimizer_at_a_time(short_games):
+    with pytest.raises(ValueError):
+        short_games.TetrisGeneticAlgorithm(steady_state=True, cma=True)
+    with pytest.raises(ValueError, match='checkpoints'):
+        short_games.TetrisGeneticAlgorithm(cma=True, checkpoint_path='run.pkl.gz').run()
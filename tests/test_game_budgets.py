@@ -0,0 +1,29 @@
+from AIPlayer.AIAgent import AIAgent
+from GA.FitnessCache import FitnessCache
+from Gameplay.AIGameSimulator import play_tetris_game
+
+WEIGHTS = [-0.3, -0.2, -0.9, 0.2]
+
+
+def test_games_report_the_budget_that_stopped_them():
+    capped = play_tetris_game(AIAgent(*WEIGHTS), max_placements=50, seed=1)
+    assert capped['stopped_by'] == 'placements' and capped['truncated']
+    assert capped['placements'] == 50
+
+    single = play_tetris_game(AIAgent(*WEIGHTS), max_placements=1, seed=1)
+    assert single['stopped_by'] == 'placements' and single['placements'] == 1
+
+    timed = play_tetris_game(AIAgent(*WEIGHTS), max_seconds=0, seed=1)
+    assert timed['stopped_by'] == 'seconds' and timed['truncated']
+
+    lost = play_tetris_game(AIAgent(0.0, 0.0, 0.0, 0.0), seed=1)
+    assert lost['stopped_by'] is None and not lost['truncated']
+
+
+def test_fitness_cache_skips_games_stopped_by_the_time_budget():
+    cache = FitnessCache()
+    cache.put(WEIGHTS, 1, (100, 1.0, 'seconds', 30, 3), 50)
+    cache.put(WEIGHTS, 2, (200, 1.0, 'placements', 50, 6), 50)
+    assert cache.get(WEIGHTS, 1, 50) is None
+    assert cache.get(WEIGHTS, 2, 50) == (200, 1.0, 'placements', 50, 6)
+    assert cache.get_statistics() == {'hits': 1, 'misses': 1, 'hit_rate': 0.5, 'size': 1}
@@ -0,0 +1,68 @@
+import time
+from multiprocessing.connection import Client
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('eckity')
+
+from eckity.fitness.simple_fitness import SimpleFitness
+
+from GA.Genetics import WeightIndividual
+from GA.IslandModel import LoopbackTransport, Migration, SocketTransport
+
+
+def island(fitness_scores, generation=0) -> SimpleNamespace:
+    """
+    Build the evolution of an island whose individuals have some fitness, the weights of each all equal to it.
+    """
+    individuals = []
+    for fitness in fitness_scores:
+        individual = WeightIndividual(SimpleFitness(higher_is_better=True))
+        individual.weights = [float(fitness)] * 4
+        individual.fitness.set_fitness(fitness)
+        individuals.append(individual)
+    population = SimpleNamespace(sub_populations=[SimpleNamespace(individuals=individuals)])
+    return SimpleNamespace(population=population, generation_num=generation)
+
+
+def fitness_of(algorithm) -> list:
+    """
+    Get the fitness of the individuals of an island.
+    """
+    return [individual.get_pure_fitness() for individual in algorithm.population.sub_populations[0].individuals]
+
+
+def test_migrants_replace_the_worst_individuals_of_the_next_island():
+    first, second = LoopbackTransport.ring(2)
+    sender, receiver = island([50, 40, 30]), island([35, 20, 10])
+    Migration(first, interval=1, migrants=2)(sender, None)
+    migration = Migration(second, interval=5, migrants=2)
+    migration(receiver, None)
+
+    assert sorted(fitness_of(receiver)) == [35, 40, 50]
+    assert migration.received == 2
+    assert [individual.weights for individual in receiver.population.sub_populations[0].individuals
+            if individual.get_pure_fitness() == 50] == [[50.0] * 4]
+
+    # Nothing is sent before the interval, and nothing comes back to the sender in a ring of two without it
+    assert first.receive() == []
+
+
+def test_socket_transport_survives_a_wrong_key():
+    receiver = SocketTransport(1, ('localhost', 0), [], b'shared')
+    sender = SocketTransport(0, ('localhost', 0), [receiver.listener.address], b'shared')
+    try:
+        with pytest.raises(Exception):
+            Client(receiver.listener.address, authkey=b'wrong')
+
+        sender.send([([1.0, 2.0, 3.0, 4.0], 100.0)])
+        deadline = time.monotonic() + 10
+        messages = []
+        while not messages and time.monotonic() < deadline:
+            messages = receiver.receive()
+            time.sleep(0.01)
+        assert messages == [(0, [([1.0, 2.0, 3.0, 4.0], 100.0)])]
+    finally:
+        sender.close()
+        receiver.close()
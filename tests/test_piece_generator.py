@@ -0,0 +1,23 @@
+from Gameplay import Definitions
+from Gameplay.PieceGenerator import PieceGenerator
+
+
+def test_same_seed_deals_the_same_shapes():
+    generators = PieceGenerator(3), PieceGenerator(3)
+    dealt = [[generator.next() for _ in range(70)] for generator in generators]
+    assert dealt[0] == dealt[1] == PieceGenerator.sequence(3, 70)
+    assert dealt[0] != PieceGenerator.sequence(4, 70)
+
+
+def test_every_bag_deals_all_the_shapes_once():
+    shapes = PieceGenerator.sequence(5, 7 * 20)
+    for start in range(0, len(shapes), 7):
+        assert sorted(shapes[start:start + 7]) == sorted(Definitions.SHAPES.keys())
+
+
+def test_peek_does_not_deal():
+    generator = PieceGenerator(6, sequence=['I', 'O'])
+    upcoming = generator.peek(10)
+    assert upcoming[:2] == ['I', 'O']
+    assert [generator.next() for _ in range(10)] == upcoming
+    assert generator.dealt == 10
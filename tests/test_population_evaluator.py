@@ -0,0 +1,60 @@
+import pytest
+
+pytest.importorskip('eckity')
+
+from eckity.fitness.simple_fitness import SimpleFitness
+
+from GA.Genetics import WeightIndividual
+from GA.PopulationEvaluator import PopulationEvaluator
+
+WEIGHTS = [[-0.3, -0.2, -0.9, 0.2], [-0.5, -0.1, -0.7, 0.4]]
+
+
+def individual(weights):
+    """
+    Build an individual with some weights.
+    """
+    result = WeightIndividual(SimpleFitness(higher_is_better=True))
+    result.weights = list(weights)
+    return result
+
+
+def test_cached_games_are_not_played_again():
+    evaluator = PopulationEvaluator(rounds=2, seed=1, processes=1, fixed_seeds=True, max_placements=40)
+    try:
+        first = [individual(weights) for weights in WEIGHTS]
+        first_scores = evaluator._evaluate_individuals(first)
+        assert (evaluator.fitness_cache.hits, evaluator.fitness_cache.misses) == (0, 4)
+
+        # The next generation plays the same seeds, so its games all come from the cache, wall time included
+        second = [individual(weights) for weights in WEIGHTS]
+        assert evaluator._evaluate_individuals(second) == first_scores
+        assert (evaluator.fitness_cache.hits, evaluator.fitness_cache.misses) == (4, 4)
+        assert [ind.game_statistics for ind in second] == [ind.game_statistics for ind in first]
+    finally:
+        evaluator.close()
+
+
+def test_elites_play_extra_rounds():
+    evaluator = PopulationEvaluator(rounds=2, seed=1, processes=1, fixed_seeds=True, elite_extra_rounds=1,
+                                    max_placements=40)
+    try:
+        elite = individual(WEIGHTS[0])
+        evaluator._evaluate_individuals([elite])
+        assert len(elite.game_statistics['scores']) == 2
+
+        # Weights evaluated in one earlier generation play one extra seed, new weights only the generation seeds
+        elite, newcomer = individual(WEIGHTS[0]), individual(WEIGHTS[1])
+        evaluator._evaluate_individuals([elite, newcomer])
+        assert len(elite.game_statistics['scores']) == 3
+        assert len(newcomer.game_statistics['scores']) == 2
+        assert len(evaluator.extra_seeds) == 1
+        assert (evaluator.fitness_cache.hits, evaluator.fitness_cache.misses) == (2, 5)
+
+        # Another generation adds a second extra seed, the first one is reused from the cache
+        elite = individual(WEIGHTS[0])
+        evaluator._evaluate_individuals([elite])
+        assert len(elite.game_statistics['scores']) == 4
+        assert (evaluator.fitness_cache.hits, evaluator.fitness_cache.misses) == (5, 6)
+    finally:
+        evaluator.close()
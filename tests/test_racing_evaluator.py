@@ -0,0 +1,40 @@
+import pytest
+
+pytest.importorskip('eckity')
+
+from eckity.fitness.simple_fitness import SimpleFitness
+
+from GA.Genetics import WeightIndividual
+from GA.RacingPopulationEvaluator import RacingPopulationEvaluator
+
+
+def individual(weights):
+    """
+    Build an individual with some weights.
+    """
+    result = WeightIndividual(SimpleFitness(higher_is_better=True))
+    result.weights = list(weights)
+    return result
+
+
+def test_racing_no_individuals_plays_nothing():
+    evaluator = RacingPopulationEvaluator(rounds=2, stages=((1, 20),), seed=1, processes=1)
+    try:
+        assert evaluator._evaluate_individuals([]) == []
+        assert evaluator.pool is None
+    finally:
+        evaluator.close()
+
+
+def test_racing_survivors_play_the_full_rounds():
+    evaluator = RacingPopulationEvaluator(rounds=2, stages=((1, 20),), keep_fraction=0.5, confidence=0.0, seed=1,
+                                          processes=1, max_placements=60)
+    individuals = [individual([-0.3, -0.2, -0.9, 0.2]), individual([0.0, 0.0, 0.0, 0.0])]
+    try:
+        fitness_scores = evaluator._evaluate_individuals(individuals)
+    finally:
+        evaluator.close()
+
+    assert len(fitness_scores) == 2
+    assert evaluator.stage_contenders[0] == 2
+    assert individuals[0].game_statistics['max_placements'] == 60
@@ -0,0 +1,77 @@
+from collections import deque
+
+import numpy as np
+import pytest
+
+from AIPlayer.Reachability import ACTIONS, Reachability
+from Gameplay import Definitions
+from Gameplay.PieceGenerator import PieceGenerator
+from Gameplay.Table import Table
+
+# The Table method of every BFS action
+TABLE_ACTIONS = {'drop': 'drop', 'left': 'shift_left', 'right': 'shift_right', 'rotate': 'rotate'}
+
+
+def random_table(seed) -> Table:
+    """
+    Build a table with a random ragged stack, holes included, and a shape spawned on it.
+    """
+    rng = np.random.default_rng(seed)
+    rows, cols = Definitions.BOARD_HEIGHT, Definitions.BOARD_WIDTH
+    heights = rng.integers(0, rows // 2, size=cols)
+    board = np.where((np.arange(rows)[:, None] >= rows - heights) & (rng.random((rows, cols)) < 0.8), 1, 0)
+
+    table = Table(rows, cols, PieceGenerator(seed))
+    table.board = board
+    table._recompute_column_statistics()
+    table.spawn_next_shape()
+    return table
+
+
+def reference_bfs(table) -> list[tuple[tuple[tuple[int, int], int], list[str]]]:
+    """
+    The BFS of the original AIBrain.find_best_placement_bfs, moving the shape on the table: states are marked
+    visited when they leave the queue, and a drop from a state the shape can not drop from lands it.
+
+    :return: The (position, orientation index) and moves of every landing, in the order they are found.
+    """
+    start = table.snapshot()
+    queue = deque([(start, [])])
+    visited = set()
+    landings = []
+    while queue:
+        token, moves = queue.popleft()
+        table.restore(token)
+        state = table.shape_position, table.current_orientation.index
+        if state in visited:
+            continue
+        visited.add(state)
+
+        for action in ACTIONS:
+            if table.current_shape_name == 'O' and action == 'rotate':
+                continue
+            table.restore(token)
+            is_valid = getattr(table, TABLE_ACTIONS[action])()
+            if not is_valid:
+                continue
+            if table.is_shape_landing():
+                landings.append((state, moves + [action]))
+            else:
+                queue.append((table.snapshot(), moves + [action]))
+    table.restore(start)
+    return landings
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_search_finds_the_landings_and_moves_of_the_original_bfs(seed):
+    table = random_table(seed)
+    if table.game_over:
+        pytest.skip("The shape does not fit at the spawn position.")
+
+    (row, col), orientation_index = table.shape_position, table.current_orientation.index
+    reachability = Reachability(table.board, table.current_shape_name)
+    landings = reachability.search(row, col, orientation_index)
+
+    found = [(reachability.position(landing), reachability.moves_to(landing)) for landing in landings]
+    assert found == reference_bfs(table)
+    assert len(found) > 0
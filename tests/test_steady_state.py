@@ -0,0 +1,29 @@
+import pytest
+
+pytest.importorskip('eckity')
+
+from eckity.fitness.simple_fitness import SimpleFitness
+
+from GA.Genetics import WeightCreator, WeightCrossover, WeightMutation
+from GA.SteadyStateEvolution import SteadyStateEvolution
+
+
+def test_more_workers_than_individuals():
+    evolution = SteadyStateEvolution(WeightCreator(4, fitness_type=SimpleFitness),
+                                     WeightCrossover(probability=0.65, arity=2),
+                                     WeightMutation(probability=0.35, arity=10),
+                                     population_size=4, evaluations=12, rounds=1, seed=1, processes=6,
+                                     max_placements=20)
+    best = evolution.evolve()
+
+    assert evolution.evaluated == 12
+    assert len(evolution.population) == 4
+    assert best.get_pure_fitness() == max(member.get_pure_fitness() for member in evolution.population)
+
+
+def test_steady_state_rejects_unsupported_options():
+    from TetrisGeneticAlgorithm import TetrisGeneticAlgorithm
+
+    ga = TetrisGeneticAlgorithm(population_size=4, generations=1, steady_state=True, store_path='games.sqlite3')
+    with pytest.raises(ValueError, match='store_path'):
+        ga.run()
@@ -0,0 +1,52 @@
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('eckity')
+
+from eckity.fitness.simple_fitness import SimpleFitness
+
+from GA.Genetics import WeightIndividual
+from GA.SurrogatePopulationEvaluator import RacingSurrogatePopulationEvaluator
+
+
+def population(weight_vectors):
+    """
+    Build a population of one sub-population with individuals of some weights.
+    """
+    individuals = []
+    for weights in weight_vectors:
+        individual = WeightIndividual(SimpleFitness(higher_is_better=True))
+        individual.weights = list(weights)
+        individuals.append(individual)
+    return SimpleNamespace(sub_populations=[SimpleNamespace(individuals=individuals)]), individuals
+
+
+def test_surrogate_screening_out_everyone_plays_nothing():
+    evaluator = RacingSurrogatePopulationEvaluator(rounds=2, stages=((1, 20),), exploration=0.0, min_samples=1,
+                                                   seed=1, processes=1)
+    evaluator.model.add([-0.3, -0.2, -0.9, 0.2], 10.0)
+    evaluator.previous_fitness = [1000.0]
+    generation, individuals = population([[-0.3, -0.2, -0.9, 0.2], [-0.4, -0.1, -0.8, 0.3]])
+    try:
+        evaluator.evaluate(generation)
+    finally:
+        evaluator.close()
+
+    assert all(individual.game_statistics['predicted'] for individual in individuals)
+    assert [individual.fitness.get_pure_fitness() for individual in individuals] == pytest.approx([10.0, 10.0])
+    assert len(evaluator.model) == 1
+
+
+def test_surrogate_learns_only_from_full_games():
+    evaluator = RacingSurrogatePopulationEvaluator(rounds=2, stages=((1, 20),), keep_fraction=0.5, confidence=0.0,
+                                                   seed=1, processes=1, max_placements=60)
+    generation, individuals = population([[-0.3, -0.2, -0.9, 0.2], [0.0, 0.0, 0.0, 0.0]])
+    try:
+        evaluator.evaluate(generation)
+    finally:
+        evaluator.close()
+
+    full = [individual for individual in individuals if individual.game_statistics['max_placements'] == 60]
+    assert len(full) < len(individuals)
+    assert len(evaluator.model) == len(full)
@@ -0,0 +1,23 @@
+from AIPlayer.AIAgent import AIAgent
+from Gameplay.AIGameSimulator import play_tetris_game
+from Gameplay.VectorizedGameSimulator import play_tetris_games
+
+WEIGHTS = [[-0.3, -0.2, -0.9, 0.2], [-0.5, -0.1, -0.7, 0.4], [-0.2, -0.6, -0.4, 0.1]]
+
+
+def test_lockstep_games_play_like_column_scan_games():
+    # Every weight vector on every seed, so games sharing a seed also share their first states
+    weights = [w for w in WEIGHTS for _ in (1, 2)]
+    seeds = [1, 2] * len(WEIGHTS)
+    results = play_tetris_games(weights, seeds, max_placements=800)
+
+    for w, seed, result in zip(weights, seeds, results):
+        expected = play_tetris_game(AIAgent(*w), max_placements=800, seed=seed)
+        assert {key: result[key] for key in expected} == expected
+
+
+def test_lockstep_games_place_the_whole_budget():
+    for max_placements in (1, 50):
+        results = play_tetris_games(WEIGHTS, [1] * len(WEIGHTS), max_placements=max_placements)
+        assert all(result['stopped_by'] == 'placements' and result['placements'] == max_placements
+                   for result in results)